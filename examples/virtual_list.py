@@ -0,0 +1,65 @@
+from setup import *
+
+from pyglet_gui.manager import Manager
+from pyglet_gui.gui import Label
+from pyglet_gui.scrollable import VirtualList
+from pyglet_gui.theme import Theme
+
+theme = Theme({"font": "Lucida Grande",
+               "font_size": 12,
+               "text_color": [255, 255, 255, 255],
+               "gui_color": [255, 0, 0, 255],
+               "button": {
+                   "down": {
+                       "image": {
+                           "source": "button-down.png",
+                           "frame": [8, 6, 2, 2],
+                           "padding": [18, 18, 8, 6]
+                       },
+                       "text_color": [0, 0, 0, 255]
+                   },
+                   "up": {
+                       "image": {
+                           "source": "button.png",
+                           "frame": [6, 5, 6, 3],
+                           "padding": [18, 18, 8, 6]
+                       }
+                   }
+               },
+               "vscrollbar": {
+                   "knob": {
+                       "image": {
+                           "source": "vscrollbar.png",
+                           "region": [0, 16, 16, 16],
+                           "frame": [0, 6, 16, 4],
+                           "padding": [0, 0, 0, 0]
+                       },
+                       "offset": [0, 0]
+                   },
+                   "bar": {
+                       "image": {
+                           "source": "vscrollbar.png",
+                           "region": [0, 64, 16, 16]
+                       },
+                       "padding": [0, 0, 0, 0]
+                   }
+               }
+              }, resources_path='../theme/')
+
+
+def create_row(index):
+    return Label('Row %d' % index)
+
+
+def bind_row(row, index):
+    row.set_text('Row %d' % index)
+
+# Set up a Manager
+Manager(
+    # a list of 100000 rows where only the visible ones are loaded.
+    VirtualList(100000, create_row, width=200, height=100, row_height=20, bind_row=bind_row),
+    window=window,
+    batch=batch,
+    theme=theme)
+
+pyglet.app.run()
@@ -4,7 +4,7 @@ from pyglet_gui.override import Label
 from pyglet_gui.constants import HALIGN_LEFT, HALIGN_RIGHT
 
 from pyglet_gui.controllers import TwoStateController
-from pyglet_gui.core import Viewer
+from pyglet_gui.core import Viewer, tint_color
 from pyglet_gui.mixins import FocusMixin
 
 class Button(TwoStateController, Viewer):
@@ -20,10 +20,35 @@ class Button(TwoStateController, Viewer):
 
     def change_state(self):
         self._is_pressed = not self._is_pressed
-        self.reload()
-        self.reset_size()
+        # only reload when the graphics of the new state have a different geometry.
+        if not self.apply_graphics():
+            self.reload()
+            self.reset_size()
         self._on_press(self._is_pressed)
 
+    def apply_graphics(self):
+        """
+        Changes the loaded graphics to the ones of our current path, keeping their vertex lists.
+        Returns False if they have a different geometry or font, and thus require a reload.
+        """
+        if not self.is_loaded:
+            return False
+
+        theme = self.theme[self.get_path()]
+        if theme['font'] != self._label.font_name or theme['font_size'] != self._label.font_size:
+            return False
+
+        if not theme['image'].apply(self._button, theme['gui_color']):
+            return False
+
+        self._apply_label_tint(theme)
+        return True
+
+    def _apply_label_tint(self, theme):
+        color = tint_color(theme['text_color'], self._tint)
+        if tuple(color) != tuple(self._label.color):
+            self._label.color = color
+
     def hit_test(self, x, y):
         return self.is_inside(x, y)
 
@@ -53,6 +78,10 @@ class Button(TwoStateController, Viewer):
         self._button.unload()
         self._label.unload()
 
+    def apply_tint(self):
+        self._button.set_tint(self._tint)
+        self._apply_label_tint(self.theme[self.get_path()])
+
     def compute_size(self):
         # Treat the height of the label as ascent + descent
         font = self._label.document.get_font()
@@ -161,6 +190,22 @@ class FocusButton(Button, FocusMixin):
         Button.__init__(self, label, is_pressed, on_press)
         FocusMixin.__init__(self)
 
+    def load_graphics(self):
+        Button.load_graphics(self)
+        FocusMixin.load_graphics(self)
+
+    def unload_graphics(self):
+        Button.unload_graphics(self)
+        FocusMixin.unload_graphics(self)
+
+    def apply_tint(self):
+        Button.apply_tint(self)
+        FocusMixin.apply_tint(self)
+
+    def layout(self):
+        Button.layout(self)
+        FocusMixin.layout(self)
+
     def on_key_press(self, symbol, modifiers):
         if symbol == pyglet.window.key.ENTER:
             self.change_state()
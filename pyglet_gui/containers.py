@@ -3,7 +3,7 @@ from functools import reduce
 from pyglet_gui.constants import HALIGN_CENTER, HALIGN_LEFT, HALIGN_RIGHT, \
     VALIGN_TOP, VALIGN_CENTER, ANCHOR_CENTER, GetRelativePoint
 
-from pyglet_gui.core import Viewer, Rectangle
+from pyglet_gui.core import Viewer, Rectangle, Controller
 
 
 class Spacer(Viewer):
@@ -22,6 +22,9 @@ class Spacer(Viewer):
 
 
 class Container(Viewer):
+    # whether we are deleting our content, see delete().
+    _is_deleting = False
+
     def __init__(self, content, width=0, height=0):
         assert isinstance(content, list)
         super(Container, self).__init__(width, height)
@@ -31,6 +34,9 @@ class Container(Viewer):
     def content(self):
         return self._content
 
+    def get_children(self):
+        return list(self._content)
+
     def set_manager(self, manager):
         Viewer.set_manager(self, manager)
         for item in self._content:
@@ -47,34 +53,84 @@ class Container(Viewer):
 
     def unload_content(self):
         for item in self._content:
-            item.unload()
+            # items added during a batch update may not be loaded yet.
+            if item.is_loaded:
+                item.unload()
 
     def unload(self):
         super(Container, self).unload()
         self.unload_content()
 
+    def _load_item(self, item):
+        """
+        Assigns us as the parent of the item, loads it and computes its size.
+        During a batch update, loading is deferred to the end of the update.
+        """
+        item.set_manager(self._manager)
+        item.parent = self
+
+        if self._manager.is_batch_updating():
+            self._manager.defer_load(item)
+        else:
+            item.load()
+            item.reset_size(reset_parent=False)
+
     def add(self, item, position=0):
         item = item or Spacer()
         assert isinstance(item, Viewer)
 
-        item.set_manager(self._manager)
-        item.parent = self
-
-        item.load()
-        item.reset_size()
+        self._load_item(item)
         self._content.insert(len(self._content) - position, item)
         self.reset_size()
 
+    def extend(self, items):
+        """
+        Adds the items to the end of the content, resetting our size once.
+        """
+        for item in items:
+            item = item or Spacer()
+            assert isinstance(item, Viewer)
+
+            self._load_item(item)
+            self._content.append(item)
+        self.reset_size()
+
     def remove(self, item):
         assert isinstance(item, Viewer)
-        item.unload()
+        if item.is_loaded:
+            item.unload()
         self._content.remove(item)
 
         item.delete()
 
         self.reset_size()
 
+    def _remove_controllers(self):
+        """
+        Removes the controllers of our subtree from their managers, with one call per manager.
+        """
+        managers = []
+        controllers = {}
+        viewers = [self]
+        while viewers:
+            viewer = viewers.pop()
+            viewers.extend(viewer.get_children())
+            manager = viewer._manager
+            if isinstance(viewer, Controller) and manager is not None and manager.has_controller(viewer):
+                if id(manager) not in controllers:
+                    managers.append(manager)
+                    controllers[id(manager)] = []
+                controllers[id(manager)].append(viewer)
+
+        for manager in managers:
+            manager.remove_controllers(controllers[id(manager)])
+
     def delete(self):
+        # the container deleting us already removed the controllers of our subtree.
+        if not (isinstance(self.parent, Container) and self.parent._is_deleting):
+            self._remove_controllers()
+        self._is_deleting = True
+
         for item in self._content:
             item.delete()
         self._content = []
@@ -203,7 +259,6 @@ class HorizontalContainer(Container):
         else:
             width = -self.padding
         for item in self._content:
-            item.compute_size()
             height = max(height, item.height)
             width += item.width + self.padding
         self._expandable = [x for x in self._content if x.is_expandable()]
@@ -256,14 +311,19 @@ class GridContainer(Container):
         """
         Adds a new row to the layout.
         """
-        assert isinstance(row, list)
-        for item in row:
-            item = item or Spacer()
-            item.set_manager(self._manager)
-            item.parent = self
-            item.load()
-            self._content.append(item)
-        self._matrix.append(row)
+        self.add_rows([row])
+
+    def add_rows(self, rows):
+        """
+        Adds new rows to the layout, resetting our size once.
+        """
+        for row in rows:
+            assert isinstance(row, list)
+            for item in row:
+                item = item or Spacer()
+                self._load_item(item)
+                self._content.append(item)
+            self._matrix.append(row)
 
         self._update_max_vectors()
 
@@ -279,9 +339,7 @@ class GridContainer(Container):
         for item in column:
             if item is not None:
                 item = item or Spacer()
-                item.set_manager(self._manager)
-                item.parent = self
-                item.load()
+                self._load_item(item)
                 self._content.append(item)
 
         # add items to the matrix, extending the grid if needed.
@@ -316,9 +374,7 @@ class GridContainer(Container):
         self._matrix[row][column] = item
         self._content.append(item)
 
-        item.set_manager(self._manager)
-        item.parent = self
-        item.load()
+        self._load_item(item)
         self.reset_size()
 
     def layout(self):
@@ -349,7 +405,6 @@ class GridContainer(Container):
             col_index = 0
             for item in row:
                 if item is not None:
-                    item.compute_size()
                     width, height = item.width, item.height
                 else:
                     width = height = 0
@@ -407,9 +462,7 @@ class Wrapper(Container):
         self.content.delete()
 
         self._content[0] = content
-        self.content.set_manager(self._manager)
-        self.content.parent = self
-        self.content.load()
+        self._load_item(content)
         self.reset_size()
 
     def expand(self, width, height):
@@ -1,3 +1,24 @@
+def tint_color(color, tint):
+    """
+    Returns the color modulated by the color tint, or the color if tint is None.
+    """
+    if tint is None:
+        return color
+    return [component * tint_component // 255 for component, tint_component in zip(color, tint)]
+
+
+def get_group_tint(group):
+    """
+    Returns the tint of the first group with one, from the group to its parents, or None.
+    """
+    while group is not None:
+        tint = getattr(group, 'tint', None)
+        if tint is not None:
+            return tint
+        group = group.parent
+    return None
+
+
 class Managed(object):
     def __init__(self):
         self._manager = None
@@ -52,13 +73,52 @@ class Rectangle(object):
 
 
 class Viewer(Rectangle, Managed):
+    # the HitGrid indexing our region when we are a controller, see ControllerManager.
+    _hit_grid = None
+
+    # the color modulating the colors of our graphics, see set_tint().
+    _tint = None
+
     def __init__(self, width=0, height=0):
         super(Managed, self).__init__()
         self._parent = None
         self._is_loaded = False
 
+        # the result of compute_size(), kept until invalidate_size().
+        self._measured_size = None
+
+        self._width = width
+        self._height = height
         Rectangle.__init__(self, 0, 0, width, height)
 
+    @property
+    def width(self):
+        return self._width
+
+    @width.setter
+    def width(self, width):
+        if width != self._width:
+            self._width = width
+            self._invalidate_sizes()
+
+    @property
+    def height(self):
+        return self._height
+
+    @height.setter
+    def height(self, height):
+        if height != self._height:
+            self._height = height
+            self._invalidate_sizes()
+
+    def _invalidate_sizes(self):
+        # our size changed, so both our measure and our parent's may have changed.
+        self._measured_size = None
+        if self._parent is not None:
+            self._parent._measured_size = None
+        if self._hit_grid is not None:
+            self._hit_grid.invalidate(self)
+
     @property
     def parent(self):
         return self._parent
@@ -71,11 +131,41 @@ class Viewer(Rectangle, Managed):
     def is_loaded(self):
         return self._is_loaded
 
+    @property
+    def tint(self):
+        return self._tint
+
+    def set_tint(self, tint, recursive=True):
+        """
+        Modulates the colors of our graphics by the color tint, or removes the tint if None,
+        rewriting their colors in place. If recursive, also tints the viewers we contain.
+        """
+        self._tint = tint
+        if self._is_loaded:
+            self.apply_tint()
+        if recursive:
+            for viewer in self.get_children():
+                viewer.set_tint(tint, recursive)
+
+    def apply_tint(self):
+        """
+        Applies our tint to our loaded graphics. Viewers with graphics override it.
+        """
+        pass
+
+    def get_children(self):
+        """
+        Returns the list of viewers we contain.
+        """
+        return []
+
     def is_expandable(self):
         return False
 
     def set_position(self, x, y):
         super(Viewer, self).set_position(x, y)
+        if self._hit_grid is not None:
+            self._hit_grid.invalidate(self)
         self.layout()
 
     def get_path(self):
@@ -84,11 +174,15 @@ class Viewer(Rectangle, Managed):
     def load(self):
         assert not self._is_loaded
         self._is_loaded = True
+        self._measured_size = None
         self.load_graphics()
+        if self._tint is not None:
+            self.apply_tint()
 
     def unload(self):
         assert self._is_loaded
         self._is_loaded = False
+        self._measured_size = None
         self.unload_graphics()
 
     def reload(self):
@@ -107,8 +201,32 @@ class Viewer(Rectangle, Managed):
     def compute_size(self):
         return self.width, self.height
 
+    def get_measured_size(self):
+        """
+        Returns compute_size(), computed once until the size is invalidated.
+        """
+        if self._measured_size is None:
+            self._measured_size = self.compute_size()
+        return self._measured_size
+
+    def invalidate_size(self):
+        """
+        Discards the measured size, e.g. because our content changed.
+        """
+        self._measured_size = None
+
     def reset_size(self, reset_parent=True):
-        width, height = self.compute_size()
+        # a bottom-up reset_size means that our content changed.
+        if reset_parent:
+            self.invalidate_size()
+
+        # on a deferred layout, a bottom-up reset_size only marks us as dirty:
+        # the manager measures and positions us on its next layout pass.
+        if reset_parent and self._manager is not None and self._manager.is_layout_deferred():
+            self._manager.invalidate_layout(self)
+            return
+
+        width, height = self.get_measured_size()
 
         # if out size changes
         if self.width != width or self.height != height:
@@ -137,5 +255,7 @@ class Controller(Managed):
         manager.add_controller(self)
 
     def delete(self):
-        self._manager.remove_controller(self)
+        # a deleted container removes the controllers of its subtree at once, see Container.delete.
+        if self._manager.has_controller(self):
+            self._manager.remove_controller(self)
         super(Controller, self).delete()
@@ -3,6 +3,7 @@ import pyglet
 from pyglet_gui.scrollbars import VScrollbar
 from pyglet_gui.core import Viewer, Rectangle
 from pyglet_gui.controllers import Controller
+from pyglet_gui.override import IncrementalTextLayout
 
 
 class Document(Controller, Viewer):
@@ -51,9 +52,9 @@ class Document(Controller, Viewer):
         if not self.set_document_style:
             self.do_set_document_style(self._manager)
 
-        self._content = pyglet.text.layout.IncrementalTextLayout(self._document,
-                                                                 self.content_width, self.max_height,
-                                                                 multiline=True, **self.get_batch('background'))
+        self._content = IncrementalTextLayout(self._document,
+                                              self.content_width, self.max_height,
+                                              multiline=True, **self.get_batch('background'))
 
     def unload_graphics(self):
         self._content.delete()
@@ -99,6 +100,9 @@ class Document(Controller, Viewer):
         if self._scrollbar is not None:
             self._scrollbar.set_position(self.x + self.content_width, self.y)
 
+    def update_scroll(self):
+        self._content.view_y = -self._scrollbar.get_knob_pos()
+
     def on_gain_highlight(self):
         if self._scrollbar is not None:
             self._manager.set_wheel_target(self._scrollbar)
@@ -125,6 +129,7 @@ class Document(Controller, Viewer):
 
     def set_text(self, text):
         self._document.text = text
+        self.invalidate_size()
         self.compute_size()
         self.layout()
 
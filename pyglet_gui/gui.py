@@ -1,6 +1,6 @@
 import pyglet.text
 from pyglet_gui.constants import VALIGN_BOTTOM, HALIGN_LEFT, HALIGN_CENTER, ANCHOR_CENTER, GetRelativePoint
-from pyglet_gui.core import Rectangle, Viewer
+from pyglet_gui.core import Rectangle, Viewer, tint_color
 from pyglet_gui.controllers import Controller
 from pyglet_gui.containers import HorizontalContainer, VerticalContainer, Wrapper
 from pyglet_gui.buttons import Button, FocusButton
@@ -29,6 +29,9 @@ class Graphic(Viewer):
     def unload_graphics(self):
         self._graphic.unload()
 
+    def apply_tint(self):
+        self._graphic.set_tint(self._tint)
+
     def expand(self, width, height):
         assert self._expandable
         self.width, self.height = width, height
@@ -74,6 +77,11 @@ class Label(Viewer):
     def unload_graphics(self):
         self.label.delete()
 
+    def apply_tint(self):
+        color = tint_color(self.color or self.theme[self.get_path()]['text_color'], self._tint)
+        if tuple(color) != tuple(self.label.color):
+            self.label.color = color
+
     def layout(self):
         font = self.label.document.get_font()
         self.label.x = self.x
@@ -121,6 +129,10 @@ class Frame(Wrapper):
             self._frame = None
         Wrapper.unload_graphics(self)
 
+    def apply_tint(self):
+        if self._frame is not None:
+            self._frame.set_tint(self._tint)
+
     def expand(self, width, height):
         if self.content.is_expandable():
             content_width, content_height = self._frame.get_content_size(width, height)
@@ -137,7 +149,6 @@ class Frame(Wrapper):
         self.content.set_position(x, y)
 
     def compute_size(self):
-        self.content.compute_size()
         return self._frame.get_needed_size(self.content.width, self.content.height)
 
 
@@ -1,9 +1,26 @@
+import heapq
+from collections import OrderedDict
+from contextlib import contextmanager
+
 import pyglet
 from pyglet import gl
 
 from pyglet_gui.constants import ANCHOR_CENTER, GetRelativePoint
-from pyglet_gui.core import Rectangle
+from pyglet_gui.core import Rectangle, Viewer
 from pyglet_gui.containers import Wrapper
+from pyglet_gui.theme import Theme
+from pyglet_gui.theme.elements import enable_compact_vertices
+from pyglet_gui.theme.instancing import enable_instancing, is_instancing_supported
+
+# the texture enabled in the texture unit that applies the tint of a manager, see ViewerManagerGroup.
+_white_texture = None
+
+
+def _get_white_texture():
+    global _white_texture
+    if _white_texture is None:
+        _white_texture = pyglet.image.SolidColorImagePattern((255, 255, 255, 255)).create_image(1, 1).get_texture()
+    return _white_texture
 
 
 class ViewerManagerGroup(pyglet.graphics.OrderedGroup):
@@ -26,6 +43,12 @@ class ViewerManagerGroup(pyglet.graphics.OrderedGroup):
         pyglet.graphics.OrderedGroup.__init__(self, self._get_next_top_order(), parent)
         self.own_order = self.order
 
+        # the translation applied to the manager's content, see ViewerManager.translation.
+        self.translation = (0, 0)
+
+        # the color modulating everything drawn in the group, see ViewerManager.set_tint.
+        self.tint = None
+
     def __eq__(self, other):
         """
         When compared with other ViewerManagerGroups, we'll return the own_order
@@ -59,16 +82,42 @@ class ViewerManagerGroup(pyglet.graphics.OrderedGroup):
 
     def set_state(self):
         """
-        Ensure that blending is set.
+        Ensure that blending is set, translates and tints the content.
         """
         gl.glPushAttrib(gl.GL_ENABLE_BIT | gl.GL_CURRENT_BIT)
         gl.glEnable(gl.GL_BLEND)
         gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl.glTranslatef(self.translation[0], self.translation[1], 0)
+        if self.tint is not None:
+            self._set_tint_state()
+
+    def _set_tint_state(self):
+        """
+        Modulates the colors by the tint in the second texture unit, which combines
+        the color of the first unit (or of the vertices) with the tint as a constant.
+        """
+        gl.glPushAttrib(gl.GL_TEXTURE_BIT)
+        gl.glActiveTexture(gl.GL_TEXTURE1)
+        texture = _get_white_texture()
+        gl.glEnable(texture.target)
+        gl.glBindTexture(texture.target, texture.id)
+        gl.glTexEnvi(gl.GL_TEXTURE_ENV, gl.GL_TEXTURE_ENV_MODE, gl.GL_COMBINE)
+        for combine, source0, source1 in ((gl.GL_COMBINE_RGB, gl.GL_SOURCE0_RGB, gl.GL_SOURCE1_RGB),
+                                          (gl.GL_COMBINE_ALPHA, gl.GL_SOURCE0_ALPHA, gl.GL_SOURCE1_ALPHA)):
+            gl.glTexEnvi(gl.GL_TEXTURE_ENV, combine, gl.GL_MODULATE)
+            gl.glTexEnvi(gl.GL_TEXTURE_ENV, source0, gl.GL_PREVIOUS)
+            gl.glTexEnvi(gl.GL_TEXTURE_ENV, source1, gl.GL_CONSTANT)
+        gl.glTexEnvfv(gl.GL_TEXTURE_ENV, gl.GL_TEXTURE_ENV_COLOR,
+                      (gl.GLfloat * 4)(*[component / 255. for component in self.tint]))
+        gl.glActiveTexture(gl.GL_TEXTURE0)
 
     def unset_state(self):
         """
-        Restore previous blending state.
+        Restore previous blending state, translation and tint.
         """
+        if self.tint is not None:
+            gl.glPopAttrib()
+        gl.glTranslatef(-self.translation[0], -self.translation[1], 0)
         gl.glPopAttrib()
 
 
@@ -79,14 +128,30 @@ class ViewerManager(Wrapper):
                  batch=None,
                  group=None,
                  anchor=ANCHOR_CENTER,
-                 offset=(0, 0)):
+                 offset=(0, 0),
+                 defer_layout=False,
+                 instanced=False,
+                 compact=False):
         super(ViewerManager, self).__init__(content, anchor=anchor)
 
         assert isinstance(theme, dict)
         self._theme = theme
+        if isinstance(theme, Theme):
+            theme.add_manager(self)
         self._manager = self
         self._offset = offset
 
+        # the position where the content was last laid out, see translation.
+        self._layout_x, self._layout_y = 0, 0
+
+        # viewers waiting for the next layout pass, see flush_layout().
+        self._is_layout_deferred = defer_layout
+        self._dirty_viewers = set()
+
+        # viewers waiting to be loaded at the end of a batch update, see batch_update().
+        self._batch_depth = 0
+        self._pending_loads = []
+
         if batch is None:
             self._batch = pyglet.graphics.Batch()
             self._has_own_batch = True
@@ -94,6 +159,13 @@ class ViewerManager(Wrapper):
             self._batch = batch
             self._has_own_batch = False
 
+        # graphic elements are drawn by the instanced renderer of the batch, when supported.
+        if instanced and is_instancing_supported():
+            enable_instancing(self._batch)
+        # graphic elements use 16 bit vertices, see enable_compact_vertices.
+        if compact:
+            enable_compact_vertices(self._batch)
+
         self._root_group = ViewerManagerGroup(parent=group)
         self.group = {'panel': pyglet.graphics.OrderedGroup(10, self.root_group),
                       'background': pyglet.graphics.OrderedGroup(20, self.root_group),
@@ -150,7 +222,7 @@ class ViewerManager(Wrapper):
         assert isinstance(offset, tuple)
         assert len(offset) == 2
         self._offset = offset
-        self.set_position(*self.get_position())
+        self._translate_to(*self.get_position())
 
     @Wrapper.theme.getter
     def theme(self):
@@ -159,7 +231,35 @@ class ViewerManager(Wrapper):
     @Wrapper.anchor.setter
     def anchor(self, anchor):
         self._anchor = anchor
-        self.set_position(*self.get_position())
+        self._translate_to(*self.get_position())
+
+    @property
+    def translation(self):
+        """
+        The translation from the coordinates of the content to the coordinates of the window.
+        """
+        return self._root_group.translation
+
+    def set_tint(self, tint, recursive=True):
+        """
+        Modulates the colors of everything we draw by the color tint, or removes the tint if None.
+        The tint is a state of our root group, so changing it rewrites no graphic and
+        recursive is ignored; it combines with the tints set on our viewers.
+        """
+        self._tint = tint
+        self._root_group.tint = tint
+
+    def set_position(self, x, y):
+        super(ViewerManager, self).set_position(x, y)
+        self._layout_x, self._layout_y = x, y
+        self._root_group.translation = (0, 0)
+
+    def _translate_to(self, x, y):
+        """
+        Moves us to (x, y) by translating the content instead of laying it out again.
+        """
+        Rectangle.set_position(self, x, y)
+        self._root_group.translation = (x - self._layout_x, y - self._layout_y)
 
     def get_position(self):
         # Calculate our position relative to our containing window,
@@ -178,6 +278,10 @@ class ViewerManager(Wrapper):
         return x, y
 
     def reset_size(self, reset_parent=True):
+        if reset_parent and self.is_layout_deferred():
+            self.invalidate_layout(self)
+            return
+
         # Manager never has parent and thus never reset_parent.
         super(ViewerManager, self).reset_size(reset_parent=False)
 
@@ -185,6 +289,140 @@ class ViewerManager(Wrapper):
         if reset_parent:
             self.set_position(*self.get_position())
 
+    def is_layout_deferred(self):
+        return self._is_layout_deferred or self._batch_depth > 0
+
+    def is_batch_updating(self):
+        return self._batch_depth > 0
+
+    def defer_load(self, viewer):
+        """
+        Loads the viewer at the end of the current batch update.
+        """
+        assert self._batch_depth > 0
+        self._pending_loads.append(viewer)
+
+    @contextmanager
+    def batch_update(self):
+        """
+        A context in which viewers added to the tree are neither loaded,
+        measured or positioned: all of it is done once, at the end of the context::
+
+            with manager.batch_update():
+                for item in items:
+                    container.add(item)
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._end_batch_update()
+
+    def _end_batch_update(self):
+        pending, self._pending_loads = self._pending_loads, []
+        for viewer in pending:
+            # viewers that were removed meanwhile have no parent, and
+            # viewers whose parent is not loaded are loaded by their parent.
+            if viewer.parent is not None and viewer.parent.is_loaded and not viewer.is_loaded:
+                viewer.load()
+                viewer.reset_size(reset_parent=False)
+        self.flush_layout()
+
+    def invalidate_layout(self, viewer):
+        """
+        Marks the viewer to be measured and positioned on the next layout pass.
+        The pass runs on the next clock tick or when flush_layout() is called.
+        """
+        if not self._dirty_viewers:
+            pyglet.clock.schedule_once(self._scheduled_flush_layout, 0)
+        self._dirty_viewers.add(viewer)
+
+    def _scheduled_flush_layout(self, dt):
+        self.flush_layout()
+
+    def flush_layout(self):
+        """
+        Lays out every viewer invalidated since the last pass.
+
+        Dirty viewers are measured from the deepest to the shallowest, each once:
+        a viewer whose size changed dirties its parent, a viewer whose size
+        didn't change is positioned, unless one of its ancestors is also positioned.
+        """
+        pyglet.clock.unschedule(self._scheduled_flush_layout)
+        dirty, self._dirty_viewers = self._dirty_viewers, set()
+
+        heap = []
+        queued = set()
+
+        def push(viewer):
+            if viewer in queued:
+                return
+            depth = 0
+            node = viewer
+            while node.parent is not None:
+                node = node.parent
+                depth += 1
+            # ignore viewers that were removed from our tree meanwhile.
+            if node is self:
+                queued.add(viewer)
+                heapq.heappush(heap, (-depth, len(queued), viewer))
+
+        for viewer in dirty:
+            if viewer.is_loaded:
+                push(viewer)
+
+        positioned = set()
+        while heap:
+            _, _, viewer = heapq.heappop(heap)
+            width, height = viewer.get_measured_size()
+            if viewer is not self and (viewer.width != width or viewer.height != height):
+                viewer.width, viewer.height = width, height
+                push(viewer.parent)
+            else:
+                viewer.width, viewer.height = width, height
+                positioned.add(viewer)
+
+        for viewer in positioned:
+            ancestor = viewer.parent
+            while ancestor is not None and ancestor not in positioned:
+                ancestor = ancestor.parent
+            if ancestor is not None:
+                continue  # it is positioned by its ancestor.
+
+            if viewer is self:
+                self.set_position(*self.get_position())
+            else:
+                viewer.layout()
+
+    def reload_theme(self, changes):
+        """
+        Called by the theme when it is reloaded with the changes of Theme.reload:
+        reloads the graphics of every viewer whose path is affected by them.
+        """
+        affected = []
+        viewers = [self]
+        while viewers:
+            viewer = viewers.pop()
+            viewers.extend(viewer.get_children())
+            if not viewer.is_loaded:
+                continue
+            try:
+                path = viewer.get_path()
+            except NotImplementedError:
+                continue
+            if self._theme.is_affected(path, changes):
+                affected.append(viewer)
+
+        with self.batch_update():
+            for viewer in affected:
+                viewer.unload_graphics()
+                viewer.load_graphics()
+                if viewer.tint is not None:
+                    viewer.apply_tint()
+                viewer.reset_size()
+
     def draw(self):
         assert self._has_own_batch
         self._batch.draw()
@@ -202,6 +440,11 @@ class ViewerManager(Wrapper):
             self._window.push_handlers(self)
 
     def delete(self):
+        if isinstance(self._theme, Theme):
+            self._theme.remove_manager(self)
+        pyglet.clock.unschedule(self._scheduled_flush_layout)
+        self._dirty_viewers = set()
+        self._pending_loads = []
         Wrapper.delete(self)
         if self._window is not None:
             self._window.remove_handlers(self)
@@ -209,47 +452,264 @@ class ViewerManager(Wrapper):
         self._batch._draw_list_dirty = True  # forces resorting groups
 
 
+class HitGrid(object):
+    """
+    A uniform grid of the regions of viewer controllers, used to find the controllers
+    at a point without hit-testing every controller.
+
+    Controllers are indexed by their (x, y, width, height); controllers whose hit_test
+    is not restricted to this region must not be added to the grid.
+    """
+    # controllers spanning more cells than this are not indexed but always tested.
+    MAX_CELLS = 64
+
+    def __init__(self, cell_size=64):
+        self._cell_size = cell_size
+
+        self._cells = {}  # maps a cell (i, j) to the set of controllers in it.
+        self._controller_cells = {}  # maps a controller to the cells it is in.
+        self._large = set()  # controllers spanning more than MAX_CELLS.
+        self._dirty = set()  # controllers whose region changed since the last query.
+
+    def add(self, controller):
+        controller._hit_grid = self
+        self._controller_cells[controller] = ()
+        self._dirty.add(controller)
+
+    def remove(self, controller):
+        controller._hit_grid = None
+        self._remove_from_cells(controller)
+        del self._controller_cells[controller]
+        self._dirty.discard(controller)
+
+    def invalidate(self, controller):
+        """
+        Marks the region of the controller to be indexed again on the next query.
+        """
+        self._dirty.add(controller)
+
+    def _remove_from_cells(self, controller):
+        for cell in self._controller_cells[controller]:
+            controllers = self._cells[cell]
+            controllers.remove(controller)
+            if not controllers:
+                del self._cells[cell]
+        self._large.discard(controller)
+
+    def _index(self, controller):
+        self._remove_from_cells(controller)
+
+        size = self._cell_size
+        i0, j0 = int(controller.x // size), int(controller.y // size)
+        i1 = int((controller.x + controller.width) // size)
+        j1 = int((controller.y + controller.height) // size)
+
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > self.MAX_CELLS:
+            self._large.add(controller)
+            self._controller_cells[controller] = ()
+            return
+
+        cells = [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(controller)
+        self._controller_cells[controller] = cells
+
+    def get_candidates(self, x, y):
+        """
+        Returns the controllers whose region may contain the point (x, y).
+        """
+        for controller in self._dirty:
+            self._index(controller)
+        self._dirty = set()
+
+        size = self._cell_size
+        candidates = self._cells.get((int(x // size), int(y // size)))
+        if candidates is None:
+            return self._large
+        return candidates | self._large
+
+
+# the handlers that controllers may implement, dispatched by the ControllerManager.
+CONTROLLER_HANDLERS = ('on_key_press', 'on_key_release', 'on_text', 'on_text_motion', 'on_text_motion_select',
+                       'on_mouse_motion', 'on_mouse_press', 'on_mouse_release', 'on_mouse_drag', 'on_mouse_scroll',
+                       'on_gain_focus', 'on_lose_focus', 'on_gain_highlight', 'on_lose_highlight')
+
+_class_handlers = {}
+
+
+def get_class_handlers(cls):
+    """
+    Returns the names of the CONTROLLER_HANDLERS the class implements, computed once per class.
+    """
+    try:
+        return _class_handlers[cls]
+    except KeyError:
+        handlers = tuple(name for name in CONTROLLER_HANDLERS if hasattr(cls, name))
+        _class_handlers[cls] = handlers
+        return handlers
+
+
+def get_handlers(controller):
+    """
+    Returns a dictionary mapping the handlers the controller implements to its bound methods.
+    """
+    if controller is None:
+        return {}
+    return dict((name, getattr(controller, name)) for name in get_class_handlers(type(controller)))
+
+
+class FocusRing(object):
+    """
+    The focusable controllers in the order they were added, as a circular doubly linked list.
+    """
+    def __init__(self):
+        self._next = {}
+        self._previous = {}
+        self._first = None
+
+    def __contains__(self, controller):
+        return controller in self._next
+
+    def __len__(self):
+        return len(self._next)
+
+    def __iter__(self):
+        controller = self._first
+        for _ in range(len(self._next)):
+            yield controller
+            controller = self._next[controller]
+
+    def add(self, controller):
+        assert controller not in self._next
+        if self._first is None:
+            self._first = controller
+            self._next[controller] = self._previous[controller] = controller
+        else:
+            last = self._previous[self._first]
+            self._next[last] = controller
+            self._previous[controller] = last
+            self._next[controller] = self._first
+            self._previous[self._first] = controller
+
+    def remove(self, controller):
+        next_controller = self._next.pop(controller)
+        previous_controller = self._previous.pop(controller)
+        if next_controller is controller:
+            self._first = None
+        else:
+            self._next[previous_controller] = next_controller
+            self._previous[next_controller] = previous_controller
+            if self._first is controller:
+                self._first = next_controller
+
+    def get_next(self, controller, direction):
+        """
+        Returns the controller after (direction=1) or before (direction=-1) the controller.
+        If the controller is not in the ring, returns the first controller.
+        """
+        if controller not in self._next:
+            return self._first
+        if direction == 1:
+            return self._next[controller]
+        return self._previous[controller]
+
+    def clear(self):
+        self._next = {}
+        self._previous = {}
+        self._first = None
+
+
 class ControllerManager:
     def __init__(self):
-        self._controllers = []  # list of controllers.
+        # maps the controllers, in the order they were added, to their order.
+        # The first added controller has priority on hit tests.
+        self._controllers = OrderedDict()
+        self._next_order = 0
+
+        # an index of the regions of controllers that are viewers.
+        self._controller_grid = HitGrid()
+        self._unindexed_controllers = set()
+
+        # the bound handlers of each controller, see get_handlers().
+        self._handlers = {}
+        self._focus_ring = FocusRing()
 
         self._hover = None  # the control that is being hovered (mouse inside)
         self._focus = None  # the control that has the focus (accepts key strokes)
+        self._hover_handlers = {}
+        self._focus_handlers = {}
 
         self.wheel_target = None  # the primary control to receive wheel events.
         self.wheel_hint = None    # the secondary control to receive wheel events.
 
     @property
     def controllers(self):
-        return self._controllers
+        return list(self._controllers)
 
     def add_controller(self, controller):
         assert controller not in self._controllers
-        self._controllers.append(controller)
+        self._controllers[controller] = self._next_order
+        self._next_order += 1
+
+        if isinstance(controller, Viewer):
+            self._controller_grid.add(controller)
+        else:
+            self._unindexed_controllers.add(controller)
+
+        self._handlers[controller] = handlers = get_handlers(controller)
+        if 'on_gain_focus' in handlers:
+            self._focus_ring.add(controller)
+
+    def _unregister(self, controller):
+        del self._controllers[controller]
+
+        if isinstance(controller, Viewer):
+            self._controller_grid.remove(controller)
+        else:
+            self._unindexed_controllers.remove(controller)
+
+        if 'on_gain_focus' in self._handlers.pop(controller):
+            self._focus_ring.remove(controller)
 
     def remove_controller(self, controller):
         assert controller in self._controllers
-        self._controllers.remove(controller)
+        self._unregister(controller)
+
         if self._hover == controller:
             self.set_hover(None)
         if self._focus == controller:
             self.set_focus(None)
 
-    def set_next_focus(self, direction):
-        assert direction in [-1, 1]
+    def remove_controllers(self, controllers):
+        """
+        Removes many controllers at once, e.g. all the controllers of a deleted subtree.
+        """
+        controllers = set(controllers)
+        for controller in controllers:
+            assert controller in self._controllers
+            self._unregister(controller)
 
-        # all the focusable controllers
-        focusable = [x for x in self._controllers if hasattr(x, 'on_gain_focus')]
-        if not focusable:
-            return
+        if self._hover in controllers:
+            self.set_hover(None)
+        if self._focus in controllers:
+            self.set_focus(None)
 
-        if self._focus is not None and self._focus in focusable:
-            index = focusable.index(self._focus)
-        else:
-            index = 0 - direction
+    def has_controller(self, controller):
+        return controller in self._controllers
+
+    def _get_handlers(self, controller):
+        try:
+            return self._handlers[controller]
+        except KeyError:
+            # e.g. None or a controller of other manager.
+            return get_handlers(controller)
+
+    def set_next_focus(self, direction):
+        assert direction in [-1, 1]
 
-        new_focus = focusable[(index + direction) % len(focusable)]
-        self.set_focus(new_focus)
+        new_focus = self._focus_ring.get_next(self._focus, direction)
+        if new_focus is not None:
+            self.set_focus(new_focus)
 
     def on_key_press(self, symbol, modifiers):
         ## move between focusable controllers.
@@ -262,36 +722,49 @@ class ControllerManager:
             self.set_next_focus(direction)
             return True  # we only change focus on the manager we are in.
 
-        if self._focus is not None and hasattr(self._focus, 'on_key_press'):
-            return self._focus.on_key_press(symbol, modifiers)
+        handler = self._focus_handlers.get('on_key_press')
+        if handler is not None:
+            return handler(symbol, modifiers)
 
     def on_key_release(self, symbol, modifiers):
-        if self._focus is not None and hasattr(self._focus, 'on_key_release'):
-            return self._focus.on_key_release(symbol, modifiers)
+        handler = self._focus_handlers.get('on_key_release')
+        if handler is not None:
+            return handler(symbol, modifiers)
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
-        if self._focus is not None and hasattr(self._focus, 'on_mouse_drag'):
-            return self._focus.on_mouse_drag(x, y, dx, dy, buttons, modifiers)
+        handler = self._focus_handlers.get('on_mouse_drag')
+        if handler is not None:
+            return handler(x, y, dx, dy, buttons, modifiers)
+
+    def get_controller_at(self, x, y):
+        """
+        Returns the first added controller whose hit_test is true at (x, y), or None.
+        """
+        candidates = [controller for controller in self._controller_grid.get_candidates(x, y)
+                      if controller.hit_test(x, y)]
+        candidates.extend(controller for controller in self._unindexed_controllers
+                          if controller.hit_test(x, y))
+        if not candidates:
+            return None
+        return min(candidates, key=self._controllers.__getitem__)
 
     def on_mouse_motion(self, x, y, dx, dy):
-        new_hover = None
-        for control in self._controllers:
-            if control.hit_test(x, y):
-                new_hover = control
-                break
-        self.set_hover(new_hover)
+        self.set_hover(self.get_controller_at(x, y))
 
-        if self._hover is not None and hasattr(self._hover, 'on_mouse_motion'):
-            return self._hover.on_mouse_motion(x, y, dx, dy)
+        handler = self._hover_handlers.get('on_mouse_motion')
+        if handler is not None:
+            return handler(x, y, dx, dy)
 
     def on_mouse_press(self, x, y, button, modifiers):
         self.set_focus(self._hover)
-        if self._focus and hasattr(self._focus, 'on_mouse_press'):
-            return self._focus.on_mouse_press(x, y, button, modifiers)
+        handler = self._focus_handlers.get('on_mouse_press')
+        if handler is not None:
+            return handler(x, y, button, modifiers)
 
     def on_mouse_release(self, x, y, button, modifiers):
-        if self._focus is not None and hasattr(self._focus, 'on_mouse_release'):
-            return self._focus.on_mouse_release(x, y, button, modifiers)
+        handler = self._focus_handlers.get('on_mouse_release')
+        if handler is not None:
+            return handler(x, y, button, modifiers)
 
     def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
         if self.wheel_target in self._controllers:
@@ -302,34 +775,43 @@ class ControllerManager:
             return False
 
     def on_text(self, text):
-        if self._focus and text != '\r' and hasattr(self._focus, 'on_text'):
-            return self._focus.on_text(text)
+        handler = self._focus_handlers.get('on_text')
+        if handler is not None and text != '\r':
+            return handler(text)
 
     def on_text_motion(self, motion):
-        if self._focus and hasattr(self._focus, 'on_text_motion'):
-            return self._focus.on_text_motion(motion)
+        handler = self._focus_handlers.get('on_text_motion')
+        if handler is not None:
+            return handler(motion)
 
     def on_text_motion_select(self, motion):
-        if self._focus and hasattr(self._focus, 'on_text_motion_select'):
-            return self._focus.on_text_motion_select(motion)
+        handler = self._focus_handlers.get('on_text_motion_select')
+        if handler is not None:
+            return handler(motion)
 
     def set_focus(self, focus):
         if self._focus == focus:
             return
-        if self._focus is not None and hasattr(self._focus, 'on_lose_focus'):
-            self._focus.on_lose_focus()
+        handler = self._focus_handlers.get('on_lose_focus')
+        if handler is not None:
+            handler()
         self._focus = focus
-        if focus is not None and hasattr(self._focus, 'on_gain_focus'):
-            self._focus.on_gain_focus()
+        self._focus_handlers = self._get_handlers(focus)
+        handler = self._focus_handlers.get('on_gain_focus')
+        if handler is not None:
+            handler()
 
     def set_hover(self, hover):
         if self._hover == hover:
             return
-        if self._hover is not None and hasattr(self._hover, 'on_lose_highlight'):
-            self._hover.on_lose_highlight()
+        handler = self._hover_handlers.get('on_lose_highlight')
+        if handler is not None:
+            handler()
         self._hover = hover
-        if hover is not None and hasattr(self._hover, 'on_gain_highlight'):
-            hover.on_gain_highlight()
+        self._hover_handlers = self._get_handlers(hover)
+        handler = self._hover_handlers.get('on_gain_highlight')
+        if handler is not None:
+            handler()
 
     def set_wheel_hint(self, control):
         self.wheel_hint = control
@@ -338,9 +820,17 @@ class ControllerManager:
         self.wheel_target = control
 
     def delete(self):
-        self._controllers = []
+        for controller in self._controllers:
+            if isinstance(controller, Viewer):
+                self._controller_grid.remove(controller)
+        self._controllers = OrderedDict()
+        self._unindexed_controllers = set()
+        self._handlers = {}
+        self._focus_ring.clear()
         self._focus = None
         self._hover = None
+        self._focus_handlers = {}
+        self._hover_handlers = {}
         self.wheel_hint = None
         self.wheel_target = None
 
@@ -354,9 +844,13 @@ class Manager(ViewerManager, ControllerManager):
                  group=None,
                  is_movable=True,
                  anchor=ANCHOR_CENTER,
-                 offset=(0, 0)):
+                 offset=(0, 0),
+                 defer_layout=False,
+                 instanced=False,
+                 compact=False):
         ControllerManager.__init__(self)
-        ViewerManager.__init__(self, content, theme, window, batch, group, anchor, offset)
+        ViewerManager.__init__(self, content, theme, window, batch, group, anchor, offset, defer_layout,
+                               instanced, compact)
 
         self.is_movable = is_movable
         self._is_dragging = False
@@ -364,23 +858,33 @@ class Manager(ViewerManager, ControllerManager):
     def hit_test(self, x, y):
         return self.is_inside(x, y)
 
+    def _to_content(self, x, y):
+        """
+        Returns the point (x, y) of the window in the coordinates of the content.
+        """
+        translation_x, translation_y = self.translation
+        return x - translation_x, y - translation_y
+
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
-        if not ControllerManager.on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
+        content_x, content_y = self._to_content(x, y)
+        if not ControllerManager.on_mouse_drag(self, content_x, content_y, dx, dy, buttons, modifiers):
             if self.is_movable and self._is_dragging:
                 x, y = self._offset
                 self._offset = (int(x + dx), int(y + dy))
-                self.set_position(*self.get_position())
+                self._translate_to(*self.get_position())
                 return True
 
     def on_mouse_motion(self, x, y, dx, dy):
-        ControllerManager.on_mouse_motion(self, x, y, dx, dy)
+        content_x, content_y = self._to_content(x, y)
+        ControllerManager.on_mouse_motion(self, content_x, content_y, dx, dy)
         if self.hit_test(x, y):
             if not self._root_group.is_on_top():
                 self.pop_to_top()
             return True
 
     def on_mouse_press(self, x, y, button, modifiers):
-        retval = ControllerManager.on_mouse_press(self, x, y, button, modifiers)
+        content_x, content_y = self._to_content(x, y)
+        retval = ControllerManager.on_mouse_press(self, content_x, content_y, button, modifiers)
         if self.hit_test(x, y):
             if not retval:
                 self._is_dragging = True
@@ -389,7 +893,12 @@ class Manager(ViewerManager, ControllerManager):
 
     def on_mouse_release(self, x, y, button, modifiers):
         self._is_dragging = False
-        return ControllerManager.on_mouse_release(self, x, y, button, modifiers)
+        content_x, content_y = self._to_content(x, y)
+        return ControllerManager.on_mouse_release(self, content_x, content_y, button, modifiers)
+
+    def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
+        content_x, content_y = self._to_content(x, y)
+        return ControllerManager.on_mouse_scroll(self, content_x, content_y, scroll_x, scroll_y)
 
     def on_resize(self, width, height):
         """
@@ -397,7 +906,7 @@ class Manager(ViewerManager, ControllerManager):
         """
         if self.screen.width != width or self.screen.height != height:
             self.screen.width, self.screen.height = width, height
-            self.set_position(*self.get_position())
+            self._translate_to(*self.get_position())
 
     def delete(self):
         ViewerManager.delete(self)
@@ -16,22 +16,33 @@ class HighlightMixin(Controller, Viewer):
 
     def on_lose_highlight(self):
         self._highlight_flag = False
-        HighlightMixin.unload_graphics(self)
+        # the highlight is hidden and kept for the next time it is shown.
+        if self._highlight is not None:
+            self._highlight.set_visible(False)
 
     def is_highlighted(self):
         return self._highlight_flag
 
     def load_graphics(self):
-        theme = self.theme[self.get_path()]
-        if self._highlight is None and self._highlight_flag:
+        # the highlight is only allocated when first highlighted.
+        if self._highlight is None:
+            if not self._highlight_flag:
+                return
+            theme = self.theme[self.get_path()]
             self._highlight = theme['highlight']['image'].generate(theme['highlight_color'],
                                                                    **self.get_batch('highlight'))
+            self._highlight.set_tint(self._tint)
+        self._highlight.set_visible(self._highlight_flag)
 
     def unload_graphics(self):
         if self._highlight is not None:
             self._highlight.unload()
             self._highlight = None
 
+    def apply_tint(self):
+        if self._highlight is not None:
+            self._highlight.set_tint(self._tint)
+
     def layout(self):
         if self._highlight is not None:
             self._highlight.update(self.x, self.y, self.width, self.height)
@@ -55,20 +66,32 @@ class FocusMixin(Controller, Viewer):
 
     def on_lose_focus(self):
         self._focus_flag = False
-        FocusMixin.unload_graphics(self)
+        # the focus is hidden and kept for the next time it is shown.
+        if self._focus is not None:
+            self._focus.set_visible(False)
         return True
 
     def is_focus(self):
         return self._focus_flag
 
     def load_graphics(self):
-        theme = self.theme[self.get_path()]
-
-        self._focus = theme['focus']['image'].generate(theme['focus_color'], **self.get_batch('highlight'))
+        # the focus is only allocated when first focused.
+        if self._focus is None:
+            if not self._focus_flag:
+                return
+            theme = self.theme[self.get_path()]
+            self._focus = theme['focus']['image'].generate(theme['focus_color'], **self.get_batch('highlight'))
+            self._focus.set_tint(self._tint)
+        self._focus.set_visible(self._focus_flag)
 
     def unload_graphics(self):
-        self._focus.unload()
-        self._focus = None
+        if self._focus is not None:
+            self._focus.unload()
+            self._focus = None
+
+    def apply_tint(self):
+        if self._focus is not None:
+            self._focus.set_tint(self._tint)
 
     def layout(self):
         if self._focus is not None:
@@ -100,16 +100,20 @@ class Dropdown(Selector, OneTimeButton):
 
         # Compute the anchor point and location for the manager
         width, height = self._manager.window.get_size()
+
+        # our position in the window, as our manager may be translated.
+        translation_x, translation_y = self._manager.translation
+        self_x, self_y = self.x + translation_x, self.y + translation_y
         if self.align == VALIGN_TOP:
             # Dropdown is at the top, pulldown appears below it
             anchor = ANCHOR_TOP_LEFT
-            x = self.x
-            y = -(height - self.y - 1)
+            x = self_x
+            y = -(height - self_y - 1)
         else:
             # Dropdown is at the bottom, pulldown appears above it
             anchor = ANCHOR_BOTTOM_LEFT
-            x = self.x
-            y = self.y + self.height + 1
+            x = self_x
+            y = self_y + self.height + 1
 
         # we set the manager
         self._pulldown_menu = Manager(
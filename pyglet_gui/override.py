@@ -1,4 +1,21 @@
 import pyglet
+from pyglet import gl
+from pyglet.text.layout import IncrementalTextLayoutGroup, TextLayoutForegroundGroup, \
+    TextLayoutForegroundDecorationGroup
+
+
+def get_group_translation(group):
+    """
+    Returns the translation that the group and its parents apply to what they draw.
+    """
+    x = y = 0
+    while group is not None:
+        translation = getattr(group, 'translation', None)
+        if translation is not None:
+            x += translation[0]
+            y += translation[1]
+        group = group.parent
+    return x, y
 
 
 class Label(pyglet.text.Label):
@@ -63,3 +80,31 @@ class InputLabel(pyglet.text.Label):
         for vlist in remove:
             vlist.delete()
             self._vertex_lists.remove(vlist)
+
+
+class TranslatedIncrementalTextLayoutGroup(IncrementalTextLayoutGroup):
+    """
+    glScissor is in window coordinates, so the clipping region has to
+    follow the translation of our parents.
+    """
+    def set_state(self):
+        gl.glPushAttrib(gl.GL_ENABLE_BIT | gl.GL_TRANSFORM_BIT | gl.GL_CURRENT_BIT)
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+
+        x, y = get_group_translation(self.parent)
+        gl.glEnable(gl.GL_SCISSOR_TEST)
+        gl.glScissor(int(self._clip_x + x), int(self._clip_y - self._clip_height + y),
+                     self._clip_width, self._clip_height)
+        gl.glTranslatef(self.translate_x, self.translate_y, 0)
+
+
+class IncrementalTextLayout(pyglet.text.layout.IncrementalTextLayout):
+    """
+    An IncrementalTextLayout that can be drawn within translated groups.
+    """
+    def _init_groups(self, group):
+        self.top_group = TranslatedIncrementalTextLayoutGroup(group)
+        self.background_group = pyglet.graphics.OrderedGroup(0, self.top_group)
+        self.foreground_group = TextLayoutForegroundGroup(1, self.top_group)
+        self.foreground_decoration_group = TextLayoutForegroundDecorationGroup(2, self.top_group)
@@ -2,36 +2,45 @@ import pyglet
 from pyglet import gl
 
 from pyglet_gui.core import Managed
+from pyglet_gui.override import get_group_translation
 from pyglet_gui.manager import ControllerManager
 
 from pyglet_gui.controllers import Controller
-from pyglet_gui.containers import Wrapper
+from pyglet_gui.containers import Container, Wrapper
 from pyglet_gui.scrollbars import HScrollbar, VScrollbar
 
 
 class ScrollableGroup(pyglet.graphics.Group):
     """
     We restrict what's shown within a Scrollable by performing a scissor
-    test.
+    test, and scroll it by translating it.
     """
     def __init__(self, x, y, width, height, parent=None):
         pyglet.graphics.Group.__init__(self, parent)
         self.x, self.y, self.width, self.height = x, y, width, height
         self.was_scissor_enabled = False
 
+        # the scroll of the content, see Scrollable.update_scroll().
+        self.translation = (0, 0)
+
     def set_state(self):
         """
-        Enables a scissor test on our region
+        Enables a scissor test on our region and translates the content
         """
         gl.glPushAttrib(gl.GL_ENABLE_BIT | gl.GL_TRANSFORM_BIT | gl.GL_CURRENT_BIT)
         self.was_scissor_enabled = gl.glIsEnabled(gl.GL_SCISSOR_TEST)
         gl.glEnable(gl.GL_SCISSOR_TEST)
-        gl.glScissor(int(self.x), int(self.y), int(self.width), int(self.height))
+
+        # the scissor is in window coordinates: we follow the translation of our parents.
+        x, y = get_group_translation(self.parent)
+        gl.glScissor(int(self.x + x), int(self.y + y), int(self.width), int(self.height))
+        gl.glTranslatef(self.translation[0], self.translation[1], 0)
 
     def unset_state(self):
         """
-        Disables the scissor test
+        Disables the scissor test and the translation
         """
+        gl.glTranslatef(-self.translation[0], -self.translation[1], 0)
         if not self.was_scissor_enabled:
             gl.glDisable(gl.GL_SCISSOR_TEST)
         gl.glPopAttrib()
@@ -64,6 +73,27 @@ class Scrollable(Wrapper, Controller, ControllerManager):
     def theme(self):
         return self._theme
 
+    @property
+    def translation(self):
+        manager_x, manager_y = self._manager.translation
+        scroll_x, scroll_y = self.root_group.translation
+        return manager_x + scroll_x, manager_y + scroll_y
+
+    def is_layout_deferred(self):
+        return self._manager is not None and self._manager.is_layout_deferred()
+
+    def invalidate_layout(self, viewer):
+        self._manager.invalidate_layout(viewer)
+
+    def is_batch_updating(self):
+        return self._manager is not None and self._manager.is_batch_updating()
+
+    def defer_load(self, viewer):
+        self._manager.defer_load(viewer)
+
+    def get_children(self):
+        return [viewer for viewer in [self.content, self._hscrollbar, self._vscrollbar] if viewer is not None]
+
     def set_manager(self, manager):
         Controller.set_manager(self, manager)
         self._theme = manager.theme
@@ -102,7 +132,7 @@ class Scrollable(Wrapper, Controller, ControllerManager):
     def hit_test(self, x, y):
         # We only intercept events for the content region, not for
         # the scrollbars. They can handle themselves.
-        return y >= self._content_y < self._content_y + self._content_height and \
+        return self._content_y <= y < self._content_y + self._content_height and \
                self._content_x <= x < self._content_x + self._content_width
 
     def is_expandable(self):
@@ -148,16 +178,49 @@ class Scrollable(Wrapper, Controller, ControllerManager):
         self.root_group.width = self._content_width + 1
         self.root_group.height = self._content_height + 1
 
-        # Work out the content layout
+        # Work out the content layout. The content is laid out unscrolled,
+        # the scroll is a translation of our group.
         self._content_x, self._content_y = self.x, y
-        left = self.x
-        top = y + self._content_height - self.content.height
-        if self._hscrollbar:
-            left -= self._hscrollbar.get_knob_pos()
-        if self._vscrollbar:
-            top += self._vscrollbar.get_knob_pos()
+        self.content.set_position(self.x, y + self._content_height - self.content.height)
+        self.update_scroll()
+
+    def update_scroll(self):
+        """
+        Scrolls the content to the position of the scrollbars.
+        """
+        x = y = 0
+        if self._hscrollbar is not None:
+            x = -self._hscrollbar.get_knob_pos()
+        if self._vscrollbar is not None:
+            y = self._vscrollbar.get_knob_pos()
+        self.root_group.translation = (x, y)
 
-        self.content.set_position(left, top)
+    def _to_content(self, x, y):
+        """
+        Returns the point (x, y) in the coordinates of the scrolled content.
+        """
+        scroll_x, scroll_y = self.root_group.translation
+        return x - scroll_x, y - scroll_y
+
+    def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
+        content_x, content_y = self._to_content(x, y)
+        return ControllerManager.on_mouse_drag(self, content_x, content_y, dx, dy, buttons, modifiers)
+
+    def on_mouse_motion(self, x, y, dx, dy):
+        content_x, content_y = self._to_content(x, y)
+        return ControllerManager.on_mouse_motion(self, content_x, content_y, dx, dy)
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        content_x, content_y = self._to_content(x, y)
+        return ControllerManager.on_mouse_press(self, content_x, content_y, button, modifiers)
+
+    def on_mouse_release(self, x, y, button, modifiers):
+        content_x, content_y = self._to_content(x, y)
+        return ControllerManager.on_mouse_release(self, content_x, content_y, button, modifiers)
+
+    def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
+        content_x, content_y = self._to_content(x, y)
+        return ControllerManager.on_mouse_scroll(self, content_x, content_y, scroll_x, scroll_y)
 
     def on_gain_highlight(self):
         if self._hscrollbar is not None:
@@ -170,7 +233,7 @@ class Scrollable(Wrapper, Controller, ControllerManager):
         self._manager.set_wheel_hint(None)
 
     def compute_size(self):
-        content_width, content_height = self.content.compute_size()
+        content_width, content_height = self.content.get_measured_size()
 
         width = min(self.max_width or content_width, content_width)
         height = min(self.max_height or content_height, content_height)
@@ -202,3 +265,159 @@ class Scrollable(Wrapper, Controller, ControllerManager):
     def delete(self):
         Wrapper.delete(self)
         ControllerManager.delete(self)
+
+
+class _VirtualRows(Container):
+    """
+    The content of a VirtualList: a container with the size of all the rows
+    that only holds the rows within a range of indexes.
+    """
+    def __init__(self, item_count, row_factory, row_width, row_height, bind_row=None):
+        Container.__init__(self, [])
+        self._item_count = item_count
+        self._row_factory = row_factory
+        self._bind_row = bind_row
+        self._row_width = row_width
+        self._row_height = row_height
+
+        # the loaded rows, by index
+        self._rows = {}
+
+        # avoids re-entering layout() when a row reset_size() during layout.
+        self._is_laying_out = False
+
+    @property
+    def item_count(self):
+        return self._item_count
+
+    def set_item_count(self, item_count):
+        self.clear()
+        self._item_count = item_count
+        self.invalidate_size()
+        # the list may keep its size, and then it does not resize us when it resets its size.
+        self.width, self.height = self.get_measured_size()
+
+    def get_row(self, index):
+        return self._rows.get(index)
+
+    def _create_row(self, index):
+        row = self._row_factory(index)
+        row.set_manager(self._manager)
+        row.parent = self
+        row.load()
+        return row
+
+    def _fit_row(self, row):
+        row.reset_size(reset_parent=False)
+        if row.is_expandable():
+            row.expand(self._row_width, self._row_height)
+
+    def _position_row(self, index, row):
+        top = self.y + self.height
+        row.set_position(self.x, top - (index + 1) * self._row_height + (self._row_height - row.height) // 2)
+
+    def set_range(self, first, last):
+        """
+        Loads and positions the rows from first (inclusive) to last (exclusive),
+        reusing the rows that leave the range when the list has a bind_row.
+        """
+        first, last = max(first, 0), min(last, self._item_count)
+
+        released = [index for index in self._rows if not first <= index < last]
+        free_rows = [self._rows.pop(index) for index in released]
+
+        self._is_laying_out = True
+        for index in range(first, last):
+            if index in self._rows:
+                continue
+            if free_rows and self._bind_row is not None:
+                row = free_rows.pop()
+                self._bind_row(row, index)
+            else:
+                row = self._create_row(index)
+            self._fit_row(row)
+            self._position_row(index, row)
+            self._rows[index] = row
+        self._is_laying_out = False
+
+        for row in free_rows:
+            row.delete()
+        self._content = [self._rows[index] for index in sorted(self._rows)]
+
+    def clear(self):
+        for row in self._content:
+            row.delete()
+        self._rows = {}
+        self._content = []
+
+    def unload(self):
+        # rows are created on demand, so we do not keep them unloaded.
+        super(_VirtualRows, self).unload()
+        self.clear()
+
+    def layout(self):
+        if self._is_laying_out:
+            return
+        for index, row in self._rows.items():
+            self._position_row(index, row)
+
+    def compute_size(self):
+        return self._row_width, self._item_count * self._row_height
+
+    def reset_size(self, reset_parent=True):
+        if self._is_laying_out:
+            return
+        super(_VirtualRows, self).reset_size(reset_parent)
+
+
+class VirtualList(Scrollable):
+    """
+    A scrollable list of item_count rows of a fixed height that only
+    loads the rows within the visible region, plus `overscan` rows on each side.
+
+    Rows are created with `row_factory(index)`. When `bind_row(row, index)` is given,
+    rows that leave the visible region are bound to the rows that enter it instead of
+    being deleted and created again.
+    """
+    def __init__(self, item_count, row_factory, width, height, row_height, bind_row=None, overscan=2):
+        Scrollable.__init__(self, content=_VirtualRows(item_count, row_factory, width, row_height, bind_row),
+                            width=width, height=height)
+        self._row_height = row_height
+        self._overscan = overscan
+
+    @property
+    def item_count(self):
+        return self.content.item_count
+
+    def set_item_count(self, item_count):
+        """
+        Changes the number of items of the list. Visible rows are bound or created again.
+        """
+        self.content.set_item_count(item_count)
+        self.reset_size()
+
+    def get_row(self, index):
+        """
+        Returns the row of the index or None if it is not loaded.
+        """
+        return self.content.get_row(index)
+
+    def get_visible_range(self):
+        """
+        Returns the range of indexes of the loaded rows.
+        """
+        top = 0
+        if self._vscrollbar is not None:
+            top = self._vscrollbar.get_knob_pos()
+        first = top // self._row_height - self._overscan
+        last = (top + self._content_height + self._row_height - 1) // self._row_height + self._overscan
+        return max(first, 0), min(last, self.item_count)
+
+    def layout(self):
+        if self.is_loaded:
+            self.content.set_range(*self.get_visible_range())
+        Scrollable.layout(self)
+
+    def update_scroll(self):
+        Scrollable.update_scroll(self)
+        self.content.set_range(*self.get_visible_range())
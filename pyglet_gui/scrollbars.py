@@ -11,19 +11,14 @@ class ScrollBar(Slider):
         # the size of the knob. Value runs from [_knob_size/2, 1 - _knob_size/2]
         self._knob_size = 0.0
 
-        self._scrolled = 0  # a cumulative value of scroll to avoid re-layout on every scroll event.
-
     def set_size(self, width, height):
         self.width = width
         self.height = height
 
     def re_layout(self):
         self.layout()
-        # when we layout, we ask the parent also re_layout since
-        # a scrollbar defines the content region.
-        if self._scrolled > 2:
-            self.parent.layout()
-            self._scrolled = 0
+        # the scrollbar defines the region of the parent's content that is shown.
+        self.parent.update_scroll()
 
     def _get_bar_region(self):
         """
@@ -58,7 +53,6 @@ class ScrollBar(Slider):
             self._manager.set_wheel_target(self)
 
     def on_lose_focus(self):
-        self._scrolled = 0
         if self._manager is not None:
             self._manager.set_wheel_target(None)
 
@@ -87,12 +81,10 @@ class HScrollbar(ScrollBar):
         relative_distance = absolute_distance/bar_width
 
         self.set_knob_pos(relative_distance)
-        self._scrolled = 10
         self.re_layout()
         return True
 
     def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
-        self._scrolled += abs(scroll_x)
         self.set_knob_pos(self._knob_pos() - float(scroll_x) / self.width)
         self.re_layout()
         return True
@@ -133,12 +125,10 @@ class VScrollbar(ScrollBar):
         absolute_distance = float(y - bar_y)
         relative_distance = absolute_distance/bar_height
         self.set_knob_pos(1 - relative_distance)
-        self._scrolled = 10
         self.re_layout()
         return True
 
     def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
-        self._scrolled += abs(scroll_y)
         self.set_knob_pos(self._knob_pos() + float(scroll_y) / self.height)
         self.re_layout()
         return True
@@ -51,6 +51,10 @@ class Slider(ContinuousStateController, Viewer):
             marker.unload()
         self._markers = []
 
+    def apply_tint(self):
+        for element in [self._bar, self._knob] + self._markers:
+            element.set_tint(self._tint)
+
     def hit_test(self, x, y):
         return self.is_inside(x, y)
 
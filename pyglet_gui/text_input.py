@@ -1,7 +1,7 @@
 import pyglet
 from pyglet_gui.mixins import FocusMixin
-from pyglet_gui.override import InputLabel
-from pyglet_gui.core import Viewer
+from pyglet_gui.override import InputLabel, IncrementalTextLayout
+from pyglet_gui.core import Viewer, tint_color
 
 
 class TextInput(FocusMixin, Viewer):
@@ -47,7 +47,7 @@ class TextInput(FocusMixin, Viewer):
     def _load_writing(self, theme):
         needed_width, needed_height = self._compute_needed_size()
 
-        self._text_layout = pyglet.text.layout.IncrementalTextLayout(
+        self._text_layout = IncrementalTextLayout(
             self._document, needed_width, needed_height,
             multiline=False, **self.get_batch('foreground'))
 
@@ -92,6 +92,16 @@ class TextInput(FocusMixin, Viewer):
 
         self._field.unload()
 
+    def apply_tint(self):
+        FocusMixin.apply_tint(self)
+        self._field.set_tint(self._tint)
+
+        color = tint_color(self.theme[self.get_path()]['text_color'], self._tint)
+        if self.is_focus():
+            self._document.set_style(0, len(self._document.text), dict(color=color))
+        else:
+            self._label.color = color
+
     def _compute_needed_size(self):
         # Calculate the needed size based on the font size
         font = self._document.get_font(0)
@@ -107,6 +117,7 @@ class TextInput(FocusMixin, Viewer):
 
     def layout(self):
         Viewer.layout(self)
+        FocusMixin.layout(self)
         self._field.update(self.x, self.y, self.width, self.height)
 
         x, y, width, height = self._field.get_content_region()
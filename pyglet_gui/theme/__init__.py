@@ -1 +1 @@
-from .theme import Theme, ThemeFromPath
+from .theme import Theme, ThemeFromPath, ThemeFromBundle
@@ -0,0 +1,218 @@
+"""
+A bundle is a theme compiled into a single file: the theme's dictionary and the
+pixels of its images, already packed into atlases. Loading a bundle only requires
+reading the file and uploading the atlases to textures.
+
+The file starts with MAGIC, followed by the length of a JSON header and the header,
+followed by the pixels of the atlases, which are uploaded to textures directly from
+the mapped file.
+"""
+import ctypes
+import json
+import mmap
+import os
+import struct
+
+import pyglet.image
+import pyglet.resource
+from pyglet import gl
+from pyglet.image.atlas import Allocator, AllocatorException
+
+from .cache import get_resources_dir
+from .parsers import TextureParser, decode_images
+
+MAGIC = b'pyglet-gui bundle'
+VERSION = 2
+
+_header_length = struct.Struct('<I')
+
+# the keys of the header, written by compile_bundle.
+_header_keys = ('version', 'mtimes', 'dictionary', 'atlases', 'images')
+
+
+def get_default_bundle_path(resources_path):
+    return os.path.join(get_resources_dir(resources_path), 'theme.bundle')
+
+
+def _pack(images, atlas_size):
+    """
+    Packs the images in atlases of atlas_size x atlas_size. Images larger than
+    an atlas are put in an atlas of their own.
+
+    Returns the list of (width, height) of each atlas and a dictionary mapping each
+    image name to (atlas index, x, y).
+    """
+    atlases = []
+    allocators = []
+    locations = {}
+
+    # packing the largest images first fills the atlases better.
+    for name in sorted(images, key=lambda name: -images[name].height):
+        image = images[name]
+        if image.width > atlas_size or image.height > atlas_size:
+            locations[name] = (len(atlases), 0, 0)
+            atlases.append((image.width, image.height))
+            allocators.append(None)
+            continue
+
+        for index, allocator in enumerate(allocators):
+            if allocator is None:
+                continue
+            try:
+                x, y = allocator.alloc(image.width, image.height)
+            except AllocatorException:
+                continue
+            locations[name] = (index, x, y)
+            break
+        else:
+            allocator = Allocator(atlas_size, atlas_size)
+            x, y = allocator.alloc(image.width, image.height)
+            locations[name] = (len(atlases), x, y)
+            atlases.append((atlas_size, atlas_size))
+            allocators.append(allocator)
+
+    return atlases, locations
+
+
+def compile_bundle(resources_path, bundle_path, atlas_size=1024):
+    """
+    Compiles the theme.json and the images in resources_path into a bundle in bundle_path.
+    """
+    resources_dir = get_resources_dir(resources_path)
+
+    theme_filename = os.path.join(resources_dir, 'theme.json')
+    with open(theme_filename, 'rb') as theme_file:
+        dictionary = json.loads(theme_file.read().decode("utf-8"))
+
+    sources = TextureParser(resources_path).get_sources(dictionary)
+    images = decode_images(pyglet.resource.Loader(resources_path), sources)
+
+    mtimes = {'theme.json': os.path.getmtime(theme_filename)}
+    for name in sources:
+        mtimes[name] = os.path.getmtime(os.path.join(resources_dir, name))
+
+    atlases, locations = _pack(images, atlas_size)
+
+    # the pixels of each atlas, bottom to top, as pyglet's image data.
+    pixels = [bytearray(width * height * 4) for width, height in atlases]
+    for name, (index, x, y) in locations.items():
+        image = images[name]
+        atlas_width = atlases[index][0]
+        data = image.get_data('RGBA', image.width * 4)
+        row_length = image.width * 4
+        for row in range(image.height):
+            start = ((y + row) * atlas_width + x) * 4
+            pixels[index][start:start + row_length] = data[row * row_length:(row + 1) * row_length]
+
+    header = {'version': VERSION,
+              'mtimes': mtimes,
+              'dictionary': dictionary,
+              'atlases': atlases,
+              'images': dict((name, locations[name] + (images[name].width, images[name].height))
+                             for name in images)}
+    header = json.dumps(header).encode('utf-8')
+
+    with open(bundle_path, 'wb') as bundle_file:
+        bundle_file.write(MAGIC)
+        bundle_file.write(_header_length.pack(len(header)))
+        bundle_file.write(header)
+        for atlas_pixels in pixels:
+            bundle_file.write(atlas_pixels)
+
+
+def _is_up_to_date(header, resources_dir):
+    # e.g. a bundle written by an older version.
+    if header.get('version') != VERSION or any(key not in header for key in _header_keys):
+        return False
+    for name, mtime in header['mtimes'].items():
+        filename = os.path.join(resources_dir, name)
+        if not os.path.exists(filename) or os.path.getmtime(filename) != mtime:
+            return False
+    return True
+
+
+def _upload_atlas(data, offset, width, height):
+    """
+    Uploads the pixels of an atlas in data, starting at offset, to a new texture.
+    """
+    texture_id = gl.GLuint()
+    gl.glGenTextures(1, ctypes.byref(texture_id))
+    gl.glBindTexture(gl.GL_TEXTURE_2D, texture_id.value)
+    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+
+    # the pixels are read from the mapping, without copying them.
+    pixels = (gl.GLubyte * (width * height * 4)).from_buffer(data, offset)
+    gl.glPushClientAttrib(gl.GL_CLIENT_PIXEL_STORE_BIT)
+    gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 4)
+    gl.glPixelStorei(gl.GL_UNPACK_ROW_LENGTH, 0)
+    gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, width, height, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, pixels)
+    gl.glPopClientAttrib()
+    del pixels  # the mapping can only be closed when it is not exported.
+
+    return pyglet.image.Texture(width, height, gl.GL_TEXTURE_2D, texture_id.value)
+
+
+def read_bundle(resources_path, bundle_path):
+    """
+    Reads the bundle and uploads its atlases to textures.
+
+    Returns the tuple (dictionary, textures, images), where images maps each image name to
+    (atlas index, x, y, width, height), or None if the bundle does not exist, is not valid or
+    is older than the sources in resources_path.
+    """
+    if not os.path.exists(bundle_path):
+        return None
+
+    with open(bundle_path, 'rb') as bundle_file:
+        # a private mapping, so the pixels can be passed to OpenGL without copying them.
+        data = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_COPY)
+        try:
+            if data[:len(MAGIC)] != MAGIC:
+                return None
+            start = len(MAGIC) + _header_length.size
+            length, = _header_length.unpack(data[len(MAGIC):start])
+            try:
+                header = json.loads(data[start:start + length].decode('utf-8'))
+            except ValueError:
+                return None
+
+            if not isinstance(header, dict) or not _is_up_to_date(header, get_resources_dir(resources_path)):
+                return None
+
+            textures = []
+            offset = start + length
+            for width, height in header['atlases']:
+                if offset + width * height * 4 > len(data):
+                    return None
+                textures.append(_upload_atlas(data, offset, width, height))
+                offset += width * height * 4
+        finally:
+            data.close()
+
+    return header['dictionary'], textures, header['images']
+
+
+class BundleTextureParser(TextureParser):
+    """
+    A TextureParser whose images are regions of the atlases of a bundle.
+    Images that are not in the bundle are loaded from resources.
+    """
+    def __init__(self, resources_path, textures, images):
+        TextureParser.__init__(self, resources_path)
+        self._atlases = textures
+        self._images = images
+
+    def get_sources(self, dictionary):
+        # images in the bundle are already decoded.
+        return TextureParser.get_sources(self, dictionary) - set(self._images)
+
+    def _load_texture(self, filename):
+        if filename not in self._images:
+            return TextureParser._load_texture(self, filename)
+
+        index, x, y, width, height = self._images[filename]
+        texture = self._atlases[index]
+        if (width, height) == (texture.width, texture.height):
+            return texture
+        return texture.get_region(x, y, width, height)
@@ -0,0 +1,233 @@
+"""
+A process-wide cache of the textures of theme images, shared by all TextureParsers,
+so themes built from the same resources decode and upload each image once.
+"""
+from collections import OrderedDict
+import os
+
+import pyglet.resource
+from pyglet.image.atlas import TextureBin
+
+# the default budget of bytes of unreferenced textures kept in the cache.
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+
+def get_resources_dir(resources_path):
+    """
+    Returns the directory of the resources_path, interpreted as pyglet.resource.Loader does.
+    """
+    if os.path.isabs(resources_path):
+        return resources_path
+    return os.path.join(pyglet.resource.get_script_home(), resources_path)
+
+
+class _Entry(object):
+    def __init__(self, mtime):
+        self.mtime = mtime  # the modification time of the image when it was loaded.
+        self.texture = None
+        self.size = 0  # the bytes of its own texture, or 0 if it is in an atlas.
+        self.atlas = None  # the atlas of the texture, or None if it has its own texture.
+        self.references = 0
+        self.regions = {}  # maps a region to a region of the texture.
+
+
+class TextureCache(object):
+    """
+    Textures of images keyed by their absolute filename. Images are packed in atlases.
+
+    Each user of a texture acquires it and releases it when it no longer needs it.
+    Textures without references are kept until the bytes resident exceed the budget,
+    and then evicted, least recently used first.
+
+    The bytes resident count whole atlases: an atlas takes its full size until all its
+    textures are evicted, so evicting a texture in an atlas may not free any bytes.
+    """
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+
+        self._entries = OrderedDict()  # from least to most recently used.
+        self._texture_bins = {}  # maps an atlas size to its TextureBin.
+        self._atlas_entries = {}  # maps an atlas to the number of its entries.
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_resident = 0
+
+    def __contains__(self, filename):
+        return filename in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _use(self, filename):
+        entry = self._entries.pop(filename)
+        self._entries[filename] = entry
+        return entry
+
+    def acquire(self, filename):
+        """
+        Returns the texture of filename and acquires it, or None if it is not in the cache.
+        """
+        if filename not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry = self._use(filename)
+        entry.references += 1
+        return entry.texture
+
+    def add(self, filename, image, atlas_size=1024):
+        """
+        Adds the image of filename to an atlas of atlas_size, or to its own texture
+        if it is larger than an atlas, and returns its texture, acquired.
+        """
+        assert filename not in self._entries
+
+        entry = _Entry(self._get_file_mtime(filename))
+        entry.references = 1
+        self._entries[filename] = entry
+        self._store(entry, image, atlas_size)
+
+        self._evict()
+        return entry.texture
+
+    def update(self, filename, image, atlas_size=1024):
+        """
+        Updates the texture of filename with the image, e.g. because its file was modified.
+        The texture is updated in place when the image has the same size; otherwise,
+        the entry gets a new texture and users holding the old one keep it.
+        """
+        entry = self._use(filename)
+        entry.mtime = self._get_file_mtime(filename)
+        if (image.width, image.height) == (entry.texture.width, entry.texture.height):
+            entry.texture.blit_into(image, 0, 0, 0)
+            return
+
+        self._free(entry)
+        entry.regions = {}
+        self._store(entry, image, atlas_size)
+        self._evict()
+
+    def _store(self, entry, image, atlas_size):
+        if atlas_size not in self._texture_bins:
+            self._texture_bins[atlas_size] = TextureBin(atlas_size, atlas_size)
+        texture_bin = self._texture_bins[atlas_size]
+
+        if image.width > texture_bin.texture_width or image.height > texture_bin.texture_height:
+            entry.texture = image.get_texture()
+            entry.atlas = None
+            entry.size = image.width * image.height * 4
+            self.bytes_resident += entry.size
+        else:
+            entry.texture = texture_bin.add(image)
+            entry.atlas = self._get_atlas(texture_bin, entry.texture)
+            entry.size = 0
+            if entry.atlas not in self._atlas_entries:
+                self._atlas_entries[entry.atlas] = 0
+                self.bytes_resident += self._get_atlas_size(entry.atlas)
+            self._atlas_entries[entry.atlas] += 1
+
+    @staticmethod
+    def _get_atlas_size(atlas):
+        return atlas.texture.width * atlas.texture.height * 4
+
+    @staticmethod
+    def _get_file_mtime(filename):
+        if os.path.exists(filename):
+            return os.path.getmtime(filename)
+        return None
+
+    def get_mtime(self, filename):
+        """
+        Returns the modification time of the file of filename when its texture was loaded.
+        """
+        return self._entries[filename].mtime
+
+    def get_texture(self, filename):
+        """
+        Returns the texture of filename, which must be acquired.
+        """
+        return self._entries[filename].texture
+
+    @staticmethod
+    def _get_atlas(texture_bin, texture):
+        for atlas in texture_bin.atlases:
+            if atlas.texture is texture.owner:
+                return atlas
+
+    def get_region(self, filename, x, y, width, height):
+        """
+        Returns the region of the texture of filename, which must be acquired.
+        Regions use the coordinates of the texture, without copying it, and are shared.
+        """
+        entry = self._use(filename)
+        region = (x, y, width, height)
+        if region in entry.regions:
+            self.hits += 1
+        else:
+            self.misses += 1
+            entry.regions[region] = entry.texture.get_region(x, y, width, height)
+        return entry.regions[region]
+
+    def release(self, filename):
+        """
+        Releases a texture acquired before. When the cache exceeds its budget,
+        textures without references are evicted.
+        """
+        entry = self._entries[filename]
+        assert entry.references > 0
+        entry.references -= 1
+        self._evict()
+
+    def _evict(self):
+        for filename in list(self._entries):
+            if self.bytes_resident <= self.budget:
+                break
+            if self._entries[filename].references == 0:
+                self._remove(filename)
+
+    def _remove(self, filename):
+        self._free(self._entries.pop(filename))
+
+    def _free(self, entry):
+        self.bytes_resident -= entry.size
+
+        # an atlas without entries is removed from its bin, so its texture is freed.
+        if entry.atlas is not None:
+            self._atlas_entries[entry.atlas] -= 1
+            if self._atlas_entries[entry.atlas] == 0:
+                del self._atlas_entries[entry.atlas]
+                self.bytes_resident -= self._get_atlas_size(entry.atlas)
+                for texture_bin in self._texture_bins.values():
+                    if entry.atlas in texture_bin.atlases:
+                        texture_bin.atlases.remove(entry.atlas)
+
+    def clear(self):
+        """
+        Evicts all textures without references.
+        """
+        for filename in list(self._entries):
+            if self._entries[filename].references == 0:
+                self._remove(filename)
+
+    def get_stats(self):
+        """
+        Returns a dictionary with the hits, misses, bytes resident and number of textures of the cache.
+        """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'bytes_resident': self.bytes_resident,
+                'textures': len(self._entries)}
+
+
+_texture_cache = None
+
+
+def get_texture_cache():
+    """
+    Returns the process-wide TextureCache.
+    """
+    global _texture_cache
+    if _texture_cache is None:
+        _texture_cache = TextureCache()
+    return _texture_cache
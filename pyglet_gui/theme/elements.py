@@ -1,8 +1,69 @@
 from abc import abstractmethod
+import weakref
 
 import pyglet
 from pyglet import gl
-from ..core import Rectangle
+from ..core import Rectangle, tint_color
+
+
+# how many times GraphicElement.update uploaded new vertices, translated them
+# in place, or skipped them because the geometry did not change.
+_update_stats = {'uploaded': 0, 'translated': 0, 'skipped': 0}
+
+
+def get_update_stats():
+    """
+    Returns a dictionary with the number of updates of graphic elements that
+    'uploaded' new vertices, 'translated' them in place or 'skipped' them.
+    """
+    return dict(_update_stats)
+
+
+def reset_update_stats():
+    for key in _update_stats:
+        _update_stats[key] = 0
+
+
+# batches whose graphic elements use 16 bit positions and texture coordinates, see enable_compact_vertices.
+_compact_batches = weakref.WeakSet()
+
+
+def enable_compact_vertices(batch):
+    """
+    Makes graphic elements created in the batch use 16 bit positions ('v2s') and
+    texture coordinates in texels ('t2s'), instead of 32 bit integers and floats.
+    An element with positions that do not fit in 16 bits uses 32 bit positions ('v2i').
+    """
+    _compact_batches.add(batch)
+
+
+def is_compact(batch):
+    return batch in _compact_batches
+
+
+def fits_in_short(values):
+    """
+    Returns whether all the values fit in a signed 16 bit integer.
+    """
+    return all(-32768 <= value <= 32767 for value in values)
+
+
+def get_texture_size(texture):
+    """
+    Returns the size of the OpenGL texture of the texture, which may be a region of it.
+    """
+    owner = getattr(texture, 'owner', None) or texture
+    return (int(round(owner.width / owner.tex_coords[3])),
+            int(round(owner.height / owner.tex_coords[7])))
+
+
+def get_texture_group(texture, batch, parent, color=None):
+    """
+    Returns the group of elements of the texture created in the batch, which sets their color if given.
+    """
+    if is_compact(batch):
+        return CompactTextureGroup(texture, parent, color)
+    return ThemeTextureGroup(texture, parent, color)
 
 
 class ThemeTextureGroup(pyglet.graphics.TextureGroup):
@@ -10,29 +71,113 @@ class ThemeTextureGroup(pyglet.graphics.TextureGroup):
     ThemeTextureGroup, in addition to setting the texture, also ensures that
     we map to the nearest texel instead of trying to interpolate from nearby
     texels. This prevents 'blooming' along the edges.
+
+    A group with a color also sets the color of its elements, which then have no color per vertex.
     """
+    def __init__(self, texture, parent=None, color=None):
+        super(ThemeTextureGroup, self).__init__(texture, parent)
+        self.color = tuple(color) if color is not None else None
 
     def set_state(self):
         super(ThemeTextureGroup, self).set_state()
         gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
         gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        if self.color is not None:
+            gl.glPushAttrib(gl.GL_CURRENT_BIT)
+            gl.glColor4ub(*self.color)
+
+    def unset_state(self):
+        if self.color is not None:
+            gl.glPopAttrib()
+        super(ThemeTextureGroup, self).unset_state()
+
+    def __eq__(self, other):
+        return pyglet.graphics.TextureGroup.__eq__(self, other) and self.color == other.color
+
+    def __hash__(self):
+        return hash((self.texture.target, self.texture.id, self.parent, self.color))
+
+
+class CompactTextureGroup(ThemeTextureGroup):
+    """
+    A ThemeTextureGroup of elements whose texture coordinates are in texels:
+    the texture matrix scales them to the texture.
+    """
+    def set_state(self):
+        super(CompactTextureGroup, self).set_state()
+        width, height = get_texture_size(self.texture)
+        gl.glMatrixMode(gl.GL_TEXTURE)
+        gl.glPushMatrix()
+        gl.glScalef(1. / width, 1. / height, 1.)
+        gl.glMatrixMode(gl.GL_MODELVIEW)
+
+    def unset_state(self):
+        gl.glMatrixMode(gl.GL_TEXTURE)
+        gl.glPopMatrix()
+        gl.glMatrixMode(gl.GL_MODELVIEW)
+        super(CompactTextureGroup, self).unset_state()
 
 
 class GraphicElement(Rectangle):
+    # whether the vertex list has a color per vertex; otherwise, the color is set by
+    # the group of the element, shared by all the elements of the same texture and color.
+    has_vertex_colors = True
+
     def __init__(self, color, batch, group, width=0, height=0):
         Rectangle.__init__(self, width=width, height=height)
         self._color = color
         self._batch = batch
         self._group = group
         self._vertex_list = None
+        self._is_visible = True
+        self._tint = None
+
+        self._is_compact = is_compact(batch)
+        self._vertex_format = self._get_vertex_format(self._get_vertices())
+        self._load()
+
+    def _get_vertex_format(self, vertices):
+        """
+        Returns the format of the positions of the vertices: 16 bit when compact and they fit.
+        """
+        if self._is_compact and fits_in_short(vertices):
+            return 'v2s'
+        return 'v2i'
+
+    def _reload(self, vertex_format):
+        """
+        Recreates the vertex list with positions in the vertex format.
+        """
+        self._vertex_list.delete()
+        self._vertex_list = None
+        self._vertex_format = vertex_format
         self._load()
 
     @abstractmethod
     def _load(self):
         assert self._vertex_list is None
         self._vertex_list = self._batch.add(12, gl.GL_LINES, self._group,
-                                            ('v2i', self._get_vertices()),
-                                            ('c4B', self._color * 12))
+                                            (self._vertex_format, self._get_vertices()),
+                                            *self._get_colors(12))
+
+    def _get_colors(self, count):
+        """
+        Returns the attributes of the colors of count vertices: none if the group sets the color.
+        """
+        if self.has_vertex_colors:
+            return [('c4B', self._get_color() * count)]
+        return []
+
+    def _get_group_color(self):
+        if self.has_vertex_colors:
+            return None
+        return self._get_color()
+
+    def _get_color(self):
+        """
+        Returns our color modulated by our tint.
+        """
+        return tint_color(self._color, self._tint)
 
     @abstractmethod
     def _get_vertices(self):
@@ -47,6 +192,71 @@ class GraphicElement(Rectangle):
         self._vertex_list = None
         self._group = None
 
+    @property
+    def color(self):
+        return self._color
+
+    @property
+    def tint(self):
+        return self._tint
+
+    @property
+    def is_visible(self):
+        return self._is_visible
+
+    def set_visible(self, is_visible):
+        """
+        Shows or hides the element, keeping its vertex list in the batch: a hidden
+        element has all its vertices in the same point, and thus draws nothing.
+        """
+        if is_visible != self._is_visible:
+            self._is_visible = is_visible
+            self._update_vertices()
+
+    def _update_vertices(self):
+        if self._is_visible:
+            vertices = self._get_vertices()
+            vertex_format = self._get_vertex_format(vertices)
+            if vertex_format != self._vertex_format:
+                self._reload(vertex_format)
+            else:
+                self._vertex_list.vertices = vertices
+        else:
+            self._vertex_list.vertices = [0] * len(self._vertex_list.vertices)
+
+    def set_color(self, color):
+        """
+        Changes the color of the element, rewriting only the colors of its vertex list,
+        or moving it to the group of its color.
+        """
+        if color != self._color:
+            self._color = color
+            self._apply_color()
+
+    def set_tint(self, tint):
+        """
+        Modulates the color of the element by the color tint, or removes the tint if None.
+        The color of the element is kept, and set_color changes the color that is tinted.
+        """
+        if tint != self._tint:
+            self._tint = tint
+            self._apply_color()
+
+    def _apply_color(self):
+        if self.has_vertex_colors:
+            self._vertex_list.colors = self._get_color() * (len(self._vertex_list.colors) // 4)
+        else:
+            self._set_texture_group(self._group.texture)
+
+    def _set_texture_group(self, texture):
+        """
+        Moves the vertex list to the group of the texture, if it differs from ours.
+        """
+        group = get_texture_group(texture, self._batch, self._group.parent, self._get_group_color())
+        if group != self._group:
+            self._batch.migrate(self._vertex_list, gl.GL_QUADS, group, self._batch)
+            self._group = group
+
     def get_content_region(self):
         return self._x, self._y, self.width, self.height
 
@@ -57,36 +267,89 @@ class GraphicElement(Rectangle):
         return content_width, content_height
 
     def update(self, x, y, width, height):
+        dx, dy = int(x) - int(self._x), int(y) - int(self._y)
+        is_resized = (width, height) != (self.width, self.height)
+
         self.set_position(x, y)
         self.width, self.height = width, height
 
-        if self._vertex_list is not None:
-            self._vertex_list.vertices = self._get_vertices()
+        # hidden elements get their vertices when shown.
+        if self._vertex_list is None or not self._is_visible:
+            _update_stats['skipped'] += 1
+        elif is_resized:
+            self._update_vertices()
+            _update_stats['uploaded'] += 1
+        elif dx or dy:
+            self._translate_vertices(dx, dy)
+            _update_stats['translated'] += 1
+        else:
+            _update_stats['skipped'] += 1
+
+    def _translate_vertices(self, dx, dy):
+        """
+        Adds (dx, dy) to the vertices, in place in the array of the vertex list.
+        """
+        if self._is_compact:
+            # the vertices lie in our rectangle, already moved by (dx, dy).
+            x1, y1 = int(self._x), int(self._y)
+            vertex_format = self._get_vertex_format((x1, y1, x1 + int(self.width), y1 + int(self.height)))
+            if vertex_format != self._vertex_format:
+                # e.g. 16 bit positions would wrap around.
+                self._reload(vertex_format)
+                return
+
+        vertices = self._vertex_list.vertices
+        for index in range(0, len(vertices), 2):
+            vertices[index] += dx
+            vertices[index + 1] += dy
 
 
 class TextureGraphicElement(GraphicElement):
+    has_vertex_colors = False
+
     def __init__(self, texture, color, batch, group):
         self.texture = texture
         GraphicElement.__init__(self,
                                 color,
                                 batch,
-                                ThemeTextureGroup(texture, group),
+                                get_texture_group(texture, batch, group, None if self.has_vertex_colors else color),
                                 texture.width, texture.height)
 
     def _load(self):
         assert self._vertex_list is None
         self._vertex_list = self._batch.add(4, gl.GL_QUADS, self._group,
-                                            ('v2i', self._get_vertices()),
-                                            ('c4B', self._color * 4),
-                                            ('t3f', self.texture.tex_coords))
+                                            (self._vertex_format, self._get_vertices()),
+                                            ('t2s' if self._is_compact else 't3f', self._get_tex_coords()),
+                                            *self._get_colors(4))
+
+    def _get_tex_coords(self):
+        tex_coords = self.texture.tex_coords
+        if self._is_compact:
+            # the (s, t) of each corner, in texels.
+            width, height = get_texture_size(self.texture)
+            texels = []
+            for s, t in zip(tex_coords[0::3], tex_coords[1::3]):
+                texels += [int(round(s * width)), int(round(t * height))]
+            return texels
+        return tex_coords
 
     def _get_vertices(self):
         x1, y1 = int(self._x), int(self._y)
         x2, y2 = x1 + int(self.width), y1 + int(self.height)
         return x1, y1, x2, y1, x2, y2, x1, y2
 
+    def set_texture(self, texture):
+        """
+        Changes the texture of the element, rewriting only the texture coordinates of its vertex list.
+        """
+        self._set_texture_group(texture)
+        self.texture = texture
+        self._vertex_list.tex_coords = self._get_tex_coords()
+
 
 class FrameTextureGraphicElement(GraphicElement):
+    has_vertex_colors = False
+
     def __init__(self, outer_texture, inner_texture, margins, padding, color, batch, group):
         self.outer_texture = outer_texture
         self.inner_texture = inner_texture
@@ -95,33 +358,49 @@ class FrameTextureGraphicElement(GraphicElement):
         GraphicElement.__init__(self,
                                 color,
                                 batch,
-                                ThemeTextureGroup(outer_texture, group),
+                                get_texture_group(outer_texture, batch, group,
+                                                  None if self.has_vertex_colors else color),
                                 outer_texture.width,
                                 outer_texture.height)
 
+    # the 9 rectangles, from the bottom left to the top right, as indices of the 4x4 vertices
+    # of _get_vertices: each rectangle is (lower left, lower right, upper right, upper left).
+    INDICES = tuple(index
+                    for row in range(3) for column in range(3)
+                    for index in (row * 4 + column, row * 4 + column + 1,
+                                  (row + 1) * 4 + column + 1, (row + 1) * 4 + column))
+
     def _load(self):
         assert self._vertex_list is None
 
-        # 36 vertices: 4 for each of the 9 rectangles.
-        self._vertex_list = self._batch.add(36, gl.GL_QUADS, self._group,
-                                            ('v2i', self._get_vertices()),
-                                            ('c4B', self._color * 36),
-                                            ('t2f', self._get_tex_coords()))
+        # 16 vertices, the corners of the 9 rectangles, shared by indices.
+        self._vertex_list = self._batch.add_indexed(16, gl.GL_QUADS, self._group, self.INDICES,
+                                                    (self._vertex_format, self._get_vertices()),
+                                                    ('t2s' if self._is_compact else 't2f', self._get_tex_coords()),
+                                                    *self._get_colors(16))
+
+    def set_textures(self, outer_texture, inner_texture):
+        """
+        Changes the textures of the element, rewriting only the texture coordinates of its vertex list.
+        """
+        self._set_texture_group(outer_texture)
+        self.outer_texture = outer_texture
+        self.inner_texture = inner_texture
+        self._vertex_list.tex_coords = self._get_tex_coords()
 
     def _get_tex_coords(self):
         x1, y1 = self.outer_texture.tex_coords[0:2]  # outer's lower left
         x4, y4 = self.outer_texture.tex_coords[6:8]  # outer's upper right
         x2, y2 = self.inner_texture.tex_coords[0:2]  # inner's lower left
         x3, y3 = self.inner_texture.tex_coords[6:8]  # inner's upper right
-        return (x1, y1, x2, y1, x2, y2, x1, y2,  # bottom left
-                x2, y1, x3, y1, x3, y2, x2, y2,  # bottom
-                x3, y1, x4, y1, x4, y2, x3, y2,  # bottom right
-                x1, y2, x2, y2, x2, y3, x1, y3,  # left
-                x2, y2, x3, y2, x3, y3, x2, y3,  # center
-                x3, y2, x4, y2, x4, y3, x3, y3,  # right
-                x1, y3, x2, y3, x2, y4, x1, y4,  # top left
-                x2, y3, x3, y3, x3, y4, x2, y4,  # top
-                x3, y3, x4, y3, x4, y4, x3, y4)  # top right
+        if self._is_compact:
+            width, height = get_texture_size(self.outer_texture)
+            x1, x2, x3, x4 = [int(round(x * width)) for x in (x1, x2, x3, x4)]
+            y1, y2, y3, y4 = [int(round(y * height)) for y in (y1, y2, y3, y4)]
+        return (x1, y1, x2, y1, x3, y1, x4, y1,  # bottom
+                x1, y2, x2, y2, x3, y2, x4, y2,
+                x1, y3, x2, y3, x3, y3, x4, y3,
+                x1, y4, x2, y4, x3, y4, x4, y4)  # top
 
     def _get_vertices(self):
         left, right, top, bottom = self.margins
@@ -130,15 +409,10 @@ class FrameTextureGraphicElement(GraphicElement):
         x3 = x1 + int(self.width) - int(right)
         y3 = y1 + int(self.height) - int(top)
         x4, y4 = x1 + int(self.width), y1 + int(self.height)
-        return (x1, y1, x2, y1, x2, y2, x1, y2,  # bottom left
-                x2, y1, x3, y1, x3, y2, x2, y2,  # bottom
-                x3, y1, x4, y1, x4, y2, x3, y2,  # bottom right
-                x1, y2, x2, y2, x2, y3, x1, y3,  # left
-                x2, y2, x3, y2, x3, y3, x2, y3,  # center
-                x3, y2, x4, y2, x4, y3, x3, y3,  # right
-                x1, y3, x2, y3, x2, y4, x1, y4,  # top left
-                x2, y3, x3, y3, x3, y4, x2, y4,  # top
-                x3, y3, x4, y3, x4, y4, x3, y4)  # top right
+        return (x1, y1, x2, y1, x3, y1, x4, y1,  # bottom
+                x1, y2, x2, y2, x3, y2, x4, y2,
+                x1, y3, x2, y3, x3, y3, x4, y3,
+                x1, y4, x2, y4, x3, y4, x4, y4)  # top
 
     def get_content_region(self):
         left, right, top, bottom = self.padding
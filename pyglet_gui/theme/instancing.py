@@ -0,0 +1,393 @@
+"""
+An optional renderer that draws the graphic elements of a batch with OpenGL 3.3 instancing.
+
+Each element is one instance of a quad, with its rectangle, margins, texture coordinates
+and color as attributes of the instance; the fragment shader maps each pixel of the quad
+to its texel, stretching the center and the edges of frames. All the elements of a
+group and a texture are drawn by one call, in the place of the group in the batch.
+
+The shaders use the compatibility profile, so they are transformed by the matrices
+set by the groups of pyglet (e.g. the translation of a Manager). The tint of a Manager
+is passed as a uniform, since the shaders replace the texture units that apply it.
+"""
+import array
+import ctypes
+import weakref
+
+import pyglet
+from pyglet import gl
+
+from ..core import get_group_tint
+from .elements import TextureGraphicElement, FrameTextureGraphicElement
+
+VERTEX_SHADER = b"""
+#version 330 compatibility
+
+layout(location = 1) in vec4 rect;     // x, y, width, height
+layout(location = 2) in vec4 margins;  // left, right, top, bottom
+layout(location = 3) in vec4 outer;    // the texture coordinates of the lower left and upper right corners
+layout(location = 4) in vec4 inner;    // the same, of the inner region
+layout(location = 5) in vec4 color;
+
+out vec2 position;  // the position in the quad, in pixels.
+flat out vec2 size;
+flat out vec4 frame_margins;
+flat out vec4 frame_outer;
+flat out vec4 frame_inner;
+flat out vec4 frame_color;
+
+void main() {
+    // a triangle strip: lower left, lower right, upper left, upper right.
+    vec2 corner = vec2(gl_VertexID & 1, gl_VertexID >> 1);
+    position = corner * rect.zw;
+    size = rect.zw;
+    frame_margins = margins;
+    frame_outer = outer;
+    frame_inner = inner;
+    frame_color = color / 255.0;
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(rect.xy + position, 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = b"""
+#version 330 compatibility
+
+uniform sampler2D texture0;
+uniform vec4 tint;
+
+in vec2 position;
+flat in vec2 size;
+flat in vec4 frame_margins;
+flat in vec4 frame_outer;
+flat in vec4 frame_inner;
+flat in vec4 frame_color;
+
+out vec4 fragment_color;
+
+// maps a position along one axis to its texture coordinate.
+float slice(float position, float size, float low, float high,
+            float outer_low, float inner_low, float inner_high, float outer_high) {
+    if (position < low)
+        return mix(outer_low, inner_low, position / low);
+    if (position > size - high)
+        return mix(inner_high, outer_high, (position - size + high) / high);
+    return mix(inner_low, inner_high, (position - low) / (size - low - high));
+}
+
+void main() {
+    vec2 tex_coords = vec2(
+        slice(position.x, size.x, frame_margins.x, frame_margins.y,
+              frame_outer.x, frame_inner.x, frame_inner.z, frame_outer.z),
+        slice(position.y, size.y, frame_margins.w, frame_margins.z,
+              frame_outer.y, frame_inner.y, frame_inner.w, frame_outer.w));
+    fragment_color = texture(texture0, tex_coords) * frame_color * tint;
+}
+"""
+
+# the number of floats of each instance: rect, margins, outer, inner and color.
+INSTANCE_SIZE = 20
+
+_program = None
+_tint_location = None
+
+
+def _compile_shader(shader_type, source):
+    shader = gl.glCreateShader(shader_type)
+    buffer = ctypes.create_string_buffer(source)
+    sources = ctypes.cast(ctypes.pointer(ctypes.pointer(buffer)),
+                          ctypes.POINTER(ctypes.POINTER(gl.GLchar)))
+    gl.glShaderSource(shader, 1, sources, None)
+    gl.glCompileShader(shader)
+
+    status = gl.GLint()
+    gl.glGetShaderiv(shader, gl.GL_COMPILE_STATUS, ctypes.byref(status))
+    if not status.value:
+        log = ctypes.create_string_buffer(4096)
+        gl.glGetShaderInfoLog(shader, len(log), None, log)
+        raise RuntimeError('Shader compilation failed: %s' % log.value.decode('utf-8', 'replace'))
+    return shader
+
+
+def get_program():
+    """
+    Returns the shader program of the renderer, linked once per process.
+    """
+    global _program, _tint_location
+    if _program is None:
+        program = gl.glCreateProgram()
+        for shader_type, source in ((gl.GL_VERTEX_SHADER, VERTEX_SHADER),
+                                    (gl.GL_FRAGMENT_SHADER, FRAGMENT_SHADER)):
+            gl.glAttachShader(program, _compile_shader(shader_type, source))
+        gl.glLinkProgram(program)
+
+        status = gl.GLint()
+        gl.glGetProgramiv(program, gl.GL_LINK_STATUS, ctypes.byref(status))
+        if not status.value:
+            log = ctypes.create_string_buffer(4096)
+            gl.glGetProgramInfoLog(program, len(log), None, log)
+            raise RuntimeError('Shader linking failed: %s' % log.value.decode('utf-8', 'replace'))
+
+        gl.glUseProgram(program)
+        gl.glUniform1i(gl.glGetUniformLocation(program, b'texture0'), 0)
+        gl.glUseProgram(0)
+        _tint_location = gl.glGetUniformLocation(program, b'tint')
+        _program = program
+    return _program
+
+
+def is_instancing_supported():
+    """
+    Returns whether the current OpenGL context supports the renderer.
+    """
+    return gl.current_context is not None and gl.gl_info.have_version(3, 3)
+
+
+class InstancedGroup(pyglet.graphics.Group):
+    """
+    The instances of the elements of a texture in a parent group. When the batch sets
+    our state, we draw all of them with one call; our vertex list in the batch only
+    has the degenerate triangle that makes the batch draw us.
+    """
+    def __init__(self, renderer, texture, parent):
+        super(InstancedGroup, self).__init__(parent)
+        self.renderer = renderer
+        self.texture = texture
+
+        self._instances = array.array('f')
+        self._free_slots = []
+        self._is_dirty = True
+        self._buffer = None
+        self._vertex_arrays = {}  # vertex array objects are not shared between contexts.
+
+        self._vertex_list = renderer.batch.add(3, gl.GL_TRIANGLES, self, ('v2i', (0, 0) * 3))
+
+    def __len__(self):
+        return len(self._instances) // INSTANCE_SIZE - len(self._free_slots)
+
+    def allocate(self):
+        """
+        Returns the slot of a new instance, which draws nothing until it is set.
+        """
+        if self._free_slots:
+            return self._free_slots.pop()
+        self._instances.extend([0.] * INSTANCE_SIZE)
+        self._is_dirty = True
+        return len(self._instances) // INSTANCE_SIZE - 1
+
+    def set(self, slot, values):
+        assert len(values) == INSTANCE_SIZE
+        self._instances[slot * INSTANCE_SIZE:(slot + 1) * INSTANCE_SIZE] = array.array('f', values)
+        self._is_dirty = True
+
+    def free(self, slot):
+        self.set(slot, [0.] * INSTANCE_SIZE)
+        self._free_slots.append(slot)
+
+    def _upload(self):
+        if self._buffer is None:
+            self._buffer = gl.GLuint()
+            gl.glGenBuffers(1, ctypes.byref(self._buffer))
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._buffer)
+        data = (gl.GLfloat * len(self._instances)).from_buffer(self._instances)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, ctypes.sizeof(data), data, gl.GL_DYNAMIC_DRAW)
+        del data  # the array can only be resized when it is not exported.
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        self._is_dirty = False
+
+    def _get_vertex_array(self):
+        context = gl.current_context
+        if context not in self._vertex_arrays:
+            vertex_array = gl.GLuint()
+            gl.glGenVertexArrays(1, ctypes.byref(vertex_array))
+            gl.glBindVertexArray(vertex_array)
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self._buffer)
+            stride = INSTANCE_SIZE * ctypes.sizeof(gl.GLfloat)
+            for index in range(5):
+                location = index + 1
+                gl.glEnableVertexAttribArray(location)
+                gl.glVertexAttribPointer(location, 4, gl.GL_FLOAT, gl.GL_FALSE, stride,
+                                         ctypes.c_void_p(4 * index * ctypes.sizeof(gl.GLfloat)))
+                gl.glVertexAttribDivisor(location, 1)
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+            gl.glBindVertexArray(0)
+            self._vertex_arrays[context] = vertex_array
+        return self._vertex_arrays[context]
+
+    def set_state(self):
+        if not self._instances:
+            return
+        if self._is_dirty:
+            self._upload()
+
+        gl.glUseProgram(get_program())
+        tint = get_group_tint(self.parent) or (255, 255, 255, 255)
+        gl.glUniform4f(_tint_location, *[component / 255. for component in tint])
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindTexture(self.texture.target, self.texture.id)
+        gl.glTexParameteri(self.texture.target, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(self.texture.target, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+
+        gl.glBindVertexArray(self._get_vertex_array())
+        gl.glDrawArraysInstanced(gl.GL_TRIANGLE_STRIP, 0, 4, len(self._instances) // INSTANCE_SIZE)
+        gl.glBindVertexArray(0)
+
+        gl.glBindTexture(self.texture.target, 0)
+        gl.glUseProgram(0)
+
+    def delete(self):
+        self._vertex_list.delete()
+        self._vertex_list = None
+        if self._buffer is not None:
+            gl.glDeleteBuffers(1, ctypes.byref(self._buffer))
+            self._buffer = None
+        for context, vertex_array in self._vertex_arrays.items():
+            if context is gl.current_context:
+                gl.glDeleteVertexArrays(1, ctypes.byref(vertex_array))
+        self._vertex_arrays = {}
+
+
+class InstancedRenderer(object):
+    """
+    The InstancedGroups of a batch, one for each texture and parent group.
+    """
+    def __init__(self, batch):
+        # a weak reference, since the renderer is the value of its batch in _renderers.
+        self._batch = weakref.ref(batch)
+        self._groups = {}
+
+    @property
+    def batch(self):
+        return self._batch()
+
+    def get_group(self, texture, parent):
+        key = (texture.id, parent)
+        if key not in self._groups:
+            self._groups[key] = InstancedGroup(self, texture, parent)
+        return self._groups[key]
+
+    def remove_group(self, group):
+        """
+        Removes the group, which has no instances, from the batch.
+        """
+        assert len(group) == 0
+        del self._groups[(group.texture.id, group.parent)]
+        group.delete()
+
+    def get_draw_calls(self):
+        """
+        Returns the number of instanced draws of the batch.
+        """
+        return len(self._groups)
+
+
+_renderers = weakref.WeakKeyDictionary()
+
+
+def enable_instancing(batch):
+    """
+    Makes the templates generate instanced elements in the batch, and returns its renderer.
+    """
+    assert is_instancing_supported()
+    if batch not in _renderers:
+        _renderers[batch] = InstancedRenderer(batch)
+    return _renderers[batch]
+
+
+def get_instanced_renderer(batch):
+    """
+    Returns the InstancedRenderer of the batch, or None if instancing is not enabled on it.
+    """
+    return _renderers.get(batch)
+
+
+class InstancedElementMixin(object):
+    """
+    A graphic element that is an instance of an InstancedGroup instead of a vertex list.
+    """
+    _instanced_group = None
+    _slot = None
+
+    def _get_texture(self):
+        raise NotImplementedError
+
+    def _get_instance(self):
+        """
+        Returns the margins and the texture coordinates of the outer and inner regions.
+        """
+        raise NotImplementedError
+
+    def _load(self):
+        assert self._instanced_group is None
+        renderer = get_instanced_renderer(self._batch)
+        self._instanced_group = renderer.get_group(self._get_texture(), self._group.parent)
+        self._slot = self._instanced_group.allocate()
+        self._update_vertices()
+
+    def _update_vertices(self):
+        if self._is_visible:
+            rect = (int(self._x), int(self._y), int(self.width), int(self.height))
+        else:
+            rect = (0, 0, 0, 0)
+        self._instanced_group.set(self._slot, rect + self._get_instance() + tuple(self._get_color()))
+
+    def unload(self):
+        self._instanced_group.free(self._slot)
+        if len(self._instanced_group) == 0:
+            self._instanced_group.renderer.remove_group(self._instanced_group)
+        self._instanced_group = None
+        self._slot = None
+        self._group = None
+
+    def update(self, x, y, width, height):
+        self.set_position(x, y)
+        self.width, self.height = width, height
+        if self._instanced_group is not None and self._is_visible:
+            self._update_vertices()
+
+    def _apply_color(self):
+        self._update_vertices()
+
+    def _set_texture_group(self, texture):
+        """
+        Moves the instance to the group of the texture, if it differs from ours.
+        """
+        renderer = self._instanced_group.renderer
+        group = renderer.get_group(texture, self._group.parent)
+        if group is not self._instanced_group:
+            self._instanced_group.free(self._slot)
+            if len(self._instanced_group) == 0:
+                renderer.remove_group(self._instanced_group)
+            self._instanced_group = group
+            self._slot = group.allocate()
+
+
+class InstancedTextureGraphicElement(InstancedElementMixin, TextureGraphicElement):
+    def _get_texture(self):
+        return self.texture
+
+    def _get_instance(self):
+        tex_coords = self.texture.tex_coords
+        uvs = tuple(tex_coords[0:2]) + tuple(tex_coords[6:8])
+        return (0, 0, 0, 0) + uvs + uvs
+
+    def set_texture(self, texture):
+        self._set_texture_group(texture)
+        self.texture = texture
+        self._update_vertices()
+
+
+class InstancedFrameTextureGraphicElement(InstancedElementMixin, FrameTextureGraphicElement):
+    def _get_texture(self):
+        return self.outer_texture
+
+    def _get_instance(self):
+        outer, inner = self.outer_texture.tex_coords, self.inner_texture.tex_coords
+        return (tuple(self.margins) +
+                tuple(outer[0:2]) + tuple(outer[6:8]) +
+                tuple(inner[0:2]) + tuple(inner[6:8]))
+
+    def set_textures(self, outer_texture, inner_texture):
+        self._set_texture_group(outer_texture)
+        self.outer_texture = outer_texture
+        self.inner_texture = inner_texture
+        self._update_vertices()
@@ -1,8 +1,83 @@
 from abc import abstractmethod
+import atexit
+import io
+import multiprocessing
+import os
+import weakref
 
+import pyglet.image
 import pyglet.resource
 
-from .templates import TextureTemplate, FrameTextureTemplate
+from .cache import get_resources_dir, get_texture_cache
+from .templates import TextureTemplate, FrameTextureTemplate, LazyTemplate
+
+
+def _decode_image(source):
+    """
+    Decodes the source, a tuple (filename, contents of the file), into
+    the tuple (width, height, RGBA pixels). Runs in the processes of decode_images.
+    """
+    filename, data = source
+    image = pyglet.image.load(filename, file=io.BytesIO(data)).get_image_data()
+    return image.width, image.height, image.get_data('RGBA', image.width * 4)
+
+
+# the pool of decode_images and its number of processes, created once and reused.
+_pool = None
+_pool_processes = 0
+
+
+def _get_pool(processes):
+    global _pool, _pool_processes
+    if _pool is not None and _pool_processes != processes:
+        _close_pool()
+    if _pool is None:
+        _pool = multiprocessing.Pool(processes)
+        _pool_processes = processes
+        atexit.register(_close_pool)
+    return _pool
+
+
+def _close_pool():
+    global _pool, _pool_processes
+    if _pool is not None:
+        _pool.close()
+        _pool.join()
+        _pool = None
+        _pool_processes = 0
+
+
+def decode_images(loader, filenames, processes=None):
+    """
+    Decodes the images in filenames, read from the loader. Returns a dictionary
+    mapping each filename to its ImageData.
+
+    By default, images are decoded in this process. With processes > 1, they are decoded in a
+    pool of processes, kept for later calls. Pools start their processes with the start method of
+    multiprocessing, which on Windows and macOS re-imports the main module: the script must then
+    guard its entry point with `if __name__ == '__main__':`.
+    """
+    sources = []
+    for filename in filenames:
+        image_file = loader.file(filename)
+        try:
+            sources.append((filename, image_file.read()))
+        finally:
+            image_file.close()
+
+    if processes is not None and processes > 1 and len(sources) > 1:
+        decoded = _get_pool(processes).map(_decode_image, sources)
+    else:
+        decoded = [_decode_image(source) for source in sources]
+
+    return dict((filename, pyglet.image.ImageData(width, height, 'RGBA', data))
+                for (filename, _), (width, height, data) in zip(sources, decoded))
+
+
+def _release_textures(cache, keys):
+    for key in keys:
+        cache.release(key)
+    keys.clear()
 
 
 class Parser:
@@ -11,6 +86,33 @@ class Parser:
     def condition_fulfilled(self, key):
         return False
 
+    def prepare(self, dictionary):
+        """
+        Called by the Theme with its whole dictionary before any element is parsed,
+        e.g. to load all resources at once.
+        """
+        pass
+
+    def release(self):
+        """
+        Called by Theme.release to release the resources of the parser.
+        """
+        pass
+
+    def reload(self):
+        """
+        Called by Theme.reload to reload resources that were modified.
+        Returns the set of sources (e.g. filenames) that changed.
+        """
+        return set()
+
+    def preload(self, elements):
+        """
+        Called by Theme.preload with the elements of lazy templates before they are loaded,
+        e.g. to load their resources at once.
+        """
+        pass
+
     @abstractmethod
     def parse_element(self, element):
         pass
@@ -18,40 +120,201 @@ class Parser:
 
 class TextureParser(Parser):
 
-    def __init__(self, resources_path):
+    def __init__(self, resources_path, atlas_size=1024, processes=None, lazy=False, cache=None):
         self._textures = {}
+        self._regions = {}  # maps (filename, region) to a region of the texture of filename.
         self._loader = pyglet.resource.Loader(resources_path)
+        self._resources_dir = get_resources_dir(resources_path)
+
+        # textures are shared with other parsers by a TextureCache, where images
+        # are packed in atlases so graphics of different images
+        # share the same texture and are drawn without changing the bound texture.
+        if cache is None:
+            cache = get_texture_cache()
+        self._cache = cache
+        self._acquired = set()  # the keys of the textures acquired from the cache.
+        # a parser collected without release() releases its textures.
+        weakref.finalize(self, _release_textures, cache, self._acquired)
+        self._mtimes = {}  # maps a filename to the modification time of its texture.
+        self._atlas_size = atlas_size
+
+        # the number of processes decoding images in prepare(); by default, they are decoded in this process.
+        self._processes = processes
+
+        # when lazy, images are only loaded when their template is first used.
+        self._lazy = lazy
 
     def condition_fulfilled(self, key):
         return key.startswith('image')
 
+    @staticmethod
+    def get_source(element):
+        """
+        Returns the filename of the image of the element.
+        """
+        if isinstance(element, dict):
+            return element['source']
+        return element
+
+    def get_sources(self, dictionary):
+        """
+        Returns the set of filenames of the images in the dictionary.
+        """
+        sources = set()
+        for key, value in dictionary.items():
+            if self.condition_fulfilled(key):
+                sources.add(self.get_source(value))
+            elif isinstance(value, dict):
+                sources |= self.get_sources(value)
+        return sources
+
+    def prepare(self, dictionary):
+        """
+        Loads all images of the dictionary, unless the parser is lazy.
+        """
+        if not self._lazy:
+            self._load_images(self.get_sources(dictionary))
+
+    def preload(self, elements):
+        self._load_images(set(self.get_source(element) for element in elements))
+
+    def _load_images(self, filenames):
+        """
+        Decodes the images in parallel and adds them to textures,
+        which is the only part that requires the main thread.
+        """
+        missing = []
+        for filename in sorted(set(filenames) - set(self._textures)):
+            texture = self._cache.acquire(self._get_key(filename))
+            if texture is None:
+                missing.append(filename)
+            else:
+                self._acquire(filename)
+                self._textures[filename] = texture
+
+        images = decode_images(self._loader, missing, self._processes)
+        for filename in missing:
+            self._textures[filename] = self._add_image(filename, images[filename])
+
+    def _get_key(self, filename):
+        """
+        Returns the key of the filename in the cache, its absolute filename.
+        """
+        return os.path.normpath(os.path.join(self._resources_dir, filename))
+
     def _get_texture(self, filename):
         """
         Returns the texture associated with the filename. Loads it from
         resources if it haven't done before.
         """
         if filename not in self._textures:
-            texture = self._loader.texture(filename)
-            self._textures[filename] = texture
+            self._textures[filename] = self._load_texture(filename)
         return self._textures[filename]
 
+    def _load_texture(self, filename):
+        """
+        Acquires the texture from the cache, loading the image from resources
+        into it if it is not there.
+        """
+        texture = self._cache.acquire(self._get_key(filename))
+        if texture is not None:
+            self._acquire(filename)
+            return texture
+
+        image_file = self._loader.file(filename)
+        try:
+            image = pyglet.image.load(filename, file=image_file)
+        finally:
+            image_file.close()
+        return self._add_image(filename, image)
+
+    def _add_image(self, filename, image):
+        """
+        Adds the image to the cache, in an atlas or in its own texture
+        if it is larger than an atlas, and returns its texture.
+        """
+        texture = self._cache.add(self._get_key(filename), image, self._atlas_size)
+        self._acquire(filename)
+        return texture
+
+    def _acquire(self, filename):
+        key = self._get_key(filename)
+        self._acquired.add(key)
+        self._mtimes[filename] = self._cache.get_mtime(key)
+
+    def reload(self):
+        """
+        Updates the textures of images modified since they were loaded.
+        Returns the set of their filenames.
+        """
+        changed = set()
+        for filename in self._textures:
+            key = self._get_key(filename)
+            if key not in self._acquired or not os.path.exists(key):
+                continue
+            mtime = os.path.getmtime(key)
+            if mtime != self._mtimes[filename]:
+                changed.add(filename)
+
+        if not changed:
+            return changed
+
+        # images are shared, so another parser may have updated them in the cache already.
+        outdated = sorted(filename for filename in changed
+                          if self._cache.get_mtime(self._get_key(filename)) != os.path.getmtime(self._get_key(filename)))
+        images = decode_images(self._loader, outdated, self._processes)
+        for filename in outdated:
+            self._cache.update(self._get_key(filename), images[filename], self._atlas_size)
+
+        for filename in changed:
+            self._textures[filename] = self._cache.get_texture(self._get_key(filename))
+            self._mtimes[filename] = self._cache.get_mtime(self._get_key(filename))
+        for key in list(self._regions):
+            if key[0] in changed:
+                del self._regions[key]
+        return changed
+
+    def release(self):
+        """
+        Releases the textures this parser acquired from the cache.
+        Its templates must no longer be used.
+        """
+        _release_textures(self._cache, self._acquired)
+        self._mtimes.clear()
+        self._textures.clear()
+        self._regions.clear()
+
     def _get_texture_region(self, filename, x, y, width, height):
         """
         Same as _get_texture, but limits the texture for a region
-        x, y, width, height.
+        x, y, width, height. The region uses the coordinates of the texture,
+        without copying it, and is shared by equal regions.
         """
-        texture = self._get_texture(filename)
-        retval = texture.get_region(x, y, width, height).get_texture()
-        return retval
+        key = (filename, (x, y, width, height))
+        if key not in self._regions:
+            texture = self._get_texture(filename)
+            if self._get_key(filename) in self._acquired:
+                self._regions[key] = self._cache.get_region(self._get_key(filename), x, y, width, height)
+            else:
+                self._regions[key] = texture.get_region(x, y, width, height)
+        return self._regions[key]
 
     def parse_element(self, element):
+        if self._lazy:
+            return LazyTemplate(self, element)
+        return self.create_template(element)
+
+    def create_template(self, element):
+        """
+        Creates the template of the element, loading its texture if needed.
+        """
         if isinstance(element, dict):
             # if it has a region, we create a texture from that region.
             # else, we use a full texture.
             if 'region' in element:
-                texture = self._get_texture_region(element['source'], *element['region'])
+                texture = self._get_texture_region(self.get_source(element), *element['region'])
             else:
-                texture = self._get_texture(element['source'])
+                texture = self._get_texture(self.get_source(element))
 
             # if it has frame, it is a FrameTexture
             # else, it is a simple texture.
@@ -65,5 +328,5 @@ class TextureParser(Parser):
                 return TextureTemplate(texture)
         # if it is of the form {'image': 'test.png'}
         else:
-            texture = self._get_texture(element)
+            texture = self._get_texture(self.get_source(element))
             return TextureTemplate(texture)
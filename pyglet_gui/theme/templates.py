@@ -1,6 +1,8 @@
 from abc import abstractmethod
 
 from .elements import GraphicElement, TextureGraphicElement, FrameTextureGraphicElement
+from .instancing import InstancedTextureGraphicElement, InstancedFrameTextureGraphicElement, \
+    get_instanced_renderer
 
 
 class Template:
@@ -11,6 +13,13 @@ class Template:
     def generate(self, color, batch, group):
         return GraphicElement(color, batch, group)
 
+    def apply(self, element, color):
+        """
+        Changes the element, generated by another template, to look as if generated by
+        this template, without changing its geometry. Returns False if it is not possible.
+        """
+        return False
+
 
 class TextureTemplate(Template):
     def __init__(self, texture, width=None, height=None):
@@ -21,20 +30,81 @@ class TextureTemplate(Template):
         self.height = height or texture.height
 
     def generate(self, color, batch, group):
+        if get_instanced_renderer(batch) is not None:
+            return InstancedTextureGraphicElement(self.texture, color, batch, group)
         return TextureGraphicElement(self.texture, color, batch, group)
 
+    def apply(self, element, color):
+        if type(element) not in (TextureGraphicElement, InstancedTextureGraphicElement) or \
+                (element.texture.width, element.texture.height) != (self.texture.width, self.texture.height):
+            return False
+        element.set_texture(self.texture)
+        element.set_color(color)
+        return True
+
 
 class FrameTextureTemplate(TextureTemplate):
     def __init__(self, texture, frame, padding, width=None, height=None):
         TextureTemplate.__init__(self, texture, width=width, height=height)
 
-        self._inner_texture = texture.get_region(*frame).get_texture()
+        # the inner region uses the coordinates of the texture, without copying it.
+        self._inner_texture = texture.get_region(*frame)
         x, y, width, height = frame
         self._margins = (x, texture.width - width - x,    # left, right
                          texture.height - height - y, y)  # top, bottom
         self._padding = padding
 
     def generate(self, color, batch, group):
-        return FrameTextureGraphicElement(
-            self.texture, self._inner_texture,
-            self._margins, self._padding, color, batch, group)
+        if get_instanced_renderer(batch) is not None:
+            element_class = InstancedFrameTextureGraphicElement
+        else:
+            element_class = FrameTextureGraphicElement
+        return element_class(self.texture, self._inner_texture,
+                             self._margins, self._padding, color, batch, group)
+
+    def apply(self, element, color):
+        if type(element) not in (FrameTextureGraphicElement, InstancedFrameTextureGraphicElement) or \
+                (element.outer_texture.width, element.outer_texture.height) != \
+                (self.texture.width, self.texture.height) or \
+                tuple(element.margins) != self._margins or list(element.padding) != list(self._padding):
+            return False
+        element.set_textures(self.texture, self._inner_texture)
+        element.set_color(color)
+        return True
+
+
+class LazyTemplate(Template):
+    """
+    A template of a parser's element that is only created by the parser,
+    loading its resources, when it is first used.
+    """
+    def __init__(self, parser, element):
+        Template.__init__(self)
+
+        self.parser = parser
+        self.element = element
+        self._template = None
+
+    @property
+    def is_loaded(self):
+        return self._template is not None
+
+    def load(self):
+        """
+        Creates the template, if not created before, and returns it.
+        """
+        if self._template is None:
+            self._template = self.parser.create_template(self.element)
+        return self._template
+
+    def generate(self, color, batch, group):
+        return self.load().generate(color, batch, group)
+
+    def apply(self, element, color):
+        return self.load().apply(element, color)
+
+    def __getattr__(self, name):
+        # the attributes of the template, e.g. its width and height.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
@@ -1,8 +1,42 @@
+import copy
 import json
+import weakref
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 import pyglet
 
 from .parsers import TextureParser
+from .templates import LazyTemplate
+from .bundle import compile_bundle, read_bundle, get_default_bundle_path, BundleTextureParser
+
+
+# the value of keys missing in a dictionary, see Theme.reload.
+_missing = object()
+
+
+class ResolvedScope(Mapping):
+    """
+    A read-only view of all keys visible from a ScopedDict,
+    including the ones inherited from its parents.
+    """
+    def __init__(self, values):
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return 'ResolvedScope(%r)' % self._values
 
 
 class ScopedDict(dict):
@@ -13,6 +47,8 @@ class ScopedDict(dict):
     -  keys can be a list such that:
         sdict[['button', 'down', 'highlight']] is equivalent
         to sdict['button']['down']['highlight'].
+
+    Lookups are memoized until any ScopedDict of the same tree is modified.
     """
 
     def __init__(self, arg=None, parent=None):
@@ -20,16 +56,52 @@ class ScopedDict(dict):
             arg = {}
         super(ScopedDict, self).__init__()
         self.parent = parent
+
+        # a tree shares a version, bumped on every modification, that invalidates the lookups.
+        if parent is not None:
+            self._version = parent._version
+        else:
+            self._version = [0]
+        self._lookups = {}
+        self._resolved = {}
+        self._lookups_version = self._version[0]
+
         for k, v in arg.items():
             if isinstance(v, dict):
                 self[k] = ScopedDict(v, self)
             else:
                 self[k] = v
 
+    def _get_lookups(self):
+        if self._lookups_version != self._version[0]:
+            self._lookups = {}
+            self._resolved = {}
+            self._lookups_version = self._version[0]
+        return self._lookups
+
+    def _invalidate_lookups(self):
+        self._version[0] += 1
+
     def __getitem__(self, key):
         if key is None:
             return self
-        elif isinstance(key, list) or isinstance(key, tuple):
+
+        if isinstance(key, list):
+            lookup_key = tuple(key)
+        else:
+            lookup_key = key
+        lookups = self._get_lookups()
+        try:
+            return lookups[lookup_key]
+        except KeyError:
+            pass
+
+        value = self._lookup(key)
+        lookups[lookup_key] = value
+        return value
+
+    def _lookup(self, key):
+        if isinstance(key, list) or isinstance(key, tuple):
             if len(key) > 1:
                 return self.__getitem__(key[0]).__getitem__(key[1:])  # start a recursion
             elif len(key) == 1:
@@ -46,11 +118,55 @@ class ScopedDict(dict):
                     raise
 
     def __setitem__(self, key, value):
+        self._invalidate_lookups()
         if isinstance(value, dict):
             dict.__setitem__(self, key, ScopedDict(value, self))
         else:
             dict.__setitem__(self, key, value)
 
+    def __delitem__(self, key):
+        self._invalidate_lookups()
+        dict.__delitem__(self, key)
+
+    def update(self, E=None, **F):
+        self._invalidate_lookups()
+        if E is None:
+            E = {}
+        dict.update(self, E, **F)
+
+    def pop(self, key, *args):
+        self._invalidate_lookups()
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        self._invalidate_lookups()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        if not dict.__contains__(self, key):
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def clear(self):
+        self._invalidate_lookups()
+        dict.clear(self)
+
+    def resolve(self, path):
+        """
+        Returns a read-only ResolvedScope with every key visible from self[path].
+        """
+        path = tuple(path)
+        self._get_lookups()
+        if path not in self._resolved:
+            scope = self[path]
+            values = {}
+            while scope is not None:
+                for key, value in scope.items():
+                    values.setdefault(key, value)
+                scope = scope.parent
+            self._resolved[path] = ResolvedScope(values)
+        return self._resolved[path]
+
     def get(self, key, default=None):
         if isinstance(key, list) or isinstance(key, tuple):
             if len(key) > 1:
@@ -89,18 +205,198 @@ class Theme(ScopedDict):
     It is initialized by a dictionary (json-like) and by a resource path.
     It maps resources in the dictionary to resources in the path,
     initializing the correct template accordingly.
+    When lazy, images are only loaded when their template is first used or preloaded.
     """
-    def __init__(self, dictionary, resources_path):
+    def __init__(self, dictionary, resources_path, parsers=None, lazy=False):
         ScopedDict.__init__(self, dictionary, None)
 
-        self._parsers = [TextureParser(resources_path)]
+        if parsers is None:
+            parsers = [TextureParser(resources_path, lazy=lazy)]
+        self._parsers = parsers
 
+        # the dictionary the theme was built from, compared on reload().
+        self._dictionary = copy.deepcopy(dictionary)
+
+        # the managers notified on reload().
+        self._managers = weakref.WeakSet()
+
+        self.prepare(dictionary)
         self.build(self, dictionary)
 
+    @staticmethod
+    def compile(resources_path, bundle_path=None):
+        """
+        Compiles the theme.json and images in resources_path into a bundle
+        that is loaded by ThemeFromBundle. Returns the path of the bundle.
+        """
+        if bundle_path is None:
+            bundle_path = get_default_bundle_path(resources_path)
+        compile_bundle(resources_path, bundle_path)
+        return bundle_path
+
     def update(self, E=None, **F):
         super(Theme, self).update(E, **F)
+        self._dictionary.update(copy.deepcopy(E))
+        self.prepare(E)
         self.build(self, E)
 
+    def add_manager(self, manager):
+        """
+        Registers a manager to be notified when the theme is reloaded.
+        """
+        self._managers.add(manager)
+
+    def remove_manager(self, manager):
+        self._managers.discard(manager)
+
+    def load_dictionary(self):
+        """
+        Returns the current dictionary of the theme, compared by reload().
+        To be subclassed by themes loaded from files.
+        """
+        return self._dictionary
+
+    def reload(self, dictionary=None):
+        """
+        Rebuilds only the keys that changed from the dictionary (by default, the one
+        returned by load_dictionary()) and the keys of images that were modified.
+        Registered managers reload the viewers affected by the changes.
+
+        Returns the list of changes, each a tuple (path, is_depth).
+        """
+        if dictionary is None:
+            dictionary = self.load_dictionary()
+
+        changed_sources = set()
+        for parser in self._parsers:
+            changed_sources |= parser.reload()
+
+        changes = self._diff(self._dictionary, dictionary, [], changed_sources)
+
+        # images of all changed keys are prepared at once.
+        self.prepare(dict((str(index), {path[-1]: self._get_value(dictionary, path)})
+                          for index, (path, _) in enumerate(changes)
+                          if self._get_value(dictionary, path) is not _missing))
+
+        for path, _ in changes:
+            target = self
+            for key in path[:-1]:
+                target = dict.__getitem__(target, key)
+
+            value = self._get_value(dictionary, path)
+            if value is _missing:
+                del target[path[-1]]
+            else:
+                self.build_element(path[-1], value, target)
+
+        self._dictionary = copy.deepcopy(dictionary)
+
+        if changes:
+            for manager in list(self._managers):
+                manager.reload_theme(changes)
+        return changes
+
+    @staticmethod
+    def _get_value(dictionary, path):
+        for key in path:
+            if key not in dictionary:
+                return _missing
+            dictionary = dictionary[key]
+        return dictionary
+
+    def _get_parser(self, key):
+        for parser in self._parsers:
+            if parser.condition_fulfilled(key):
+                return parser
+
+    def _diff(self, old, new, path, changed_sources):
+        """
+        Returns the list of (path, is_depth) of keys that differ between old and new,
+        or whose image is in changed_sources.
+        """
+        changes = []
+        for key in sorted(set(old) | set(new)):
+            parser = self._get_parser(key)
+            old_value, new_value = old.get(key), new.get(key)
+
+            if parser is None and isinstance(old_value, dict) and isinstance(new_value, dict):
+                changes += self._diff(old_value, new_value, path + [key], changed_sources)
+            elif key not in old or key not in new or old_value != new_value:
+                is_depth = parser is None and (isinstance(old_value, dict) or isinstance(new_value, dict))
+                changes.append((path + [key], is_depth))
+            elif parser is not None and parser.get_source(new_value) in changed_sources:
+                changes.append((path + [key], False))
+        return changes
+
+    def is_affected(self, path, changes):
+        """
+        Returns whether the viewer with path (see Viewer.get_path) uses any of the changes
+        returned by reload(): a depth in, or above, its path, or a key it inherits.
+        """
+        if path is None:
+            path = []
+        elif not isinstance(path, (list, tuple)):
+            path = [path]
+        path = list(path)
+
+        for changed_path, is_depth in changes:
+            if path[:len(changed_path)] == changed_path or changed_path[:len(path)] == path:
+                return True
+            if not is_depth and path[:len(changed_path) - 1] == changed_path[:-1] and \
+                    not self._is_overridden(path, changed_path):
+                return True
+        return False
+
+    def _is_overridden(self, path, changed_path):
+        """
+        Returns whether the key of changed_path is overridden by a depth of path below it.
+        """
+        key = changed_path[-1]
+        target = self
+        for depth, path_key in enumerate(path):
+            if not isinstance(target, dict) or not dict.__contains__(target, path_key):
+                return False
+            target = dict.__getitem__(target, path_key)
+            if depth >= len(changed_path) - 1 and isinstance(target, dict) and dict.__contains__(target, key):
+                return True
+        return False
+
+    def prepare(self, dictionary):
+        """
+        Lets each parser prepare the elements of the dictionary before they are built.
+        """
+        for parser in self._parsers:
+            parser.prepare(dictionary)
+
+    def release(self):
+        """
+        Releases the resources of the theme, e.g. its textures in the TextureCache.
+        Its templates must no longer be used.
+        """
+        for parser in self._parsers:
+            parser.release()
+
+    def preload(self, paths):
+        """
+        Loads the lazy templates in each path, e.g. ['button'], and in its depths.
+        """
+        templates = []
+        for path in paths:
+            self._collect_lazy_templates(self[path], templates)
+
+        for parser in self._parsers:
+            parser.preload([template.element for template in templates if template.parser is parser])
+        for template in templates:
+            template.load()
+
+    def _collect_lazy_templates(self, value, templates):
+        if isinstance(value, LazyTemplate):
+            if not value.is_loaded:
+                templates.append(value)
+        elif isinstance(value, dict):
+            for child in value.values():
+                self._collect_lazy_templates(child, templates)
+
     def build_element(self, key, value, target):
 
         for parser in self._parsers:
@@ -134,10 +430,40 @@ class ThemeFromPath(Theme):
     The convention is that the json file is called 'theme.json' and lives
     inside the resources_path given.
     """
-    def __init__(self, resources_path):
-        theme_file = pyglet.resource.Loader(resources_path).file('theme.json')
+    def __init__(self, resources_path, lazy=False):
+        self._resources_path = resources_path
+        super(ThemeFromPath, self).__init__(self.load_dictionary(), resources_path, lazy=lazy)
+
+    def load_dictionary(self):
+        theme_file = pyglet.resource.Loader(self._resources_path).file('theme.json')
         try:
-            dictionary = json.loads(theme_file.read().decode("utf-8"))
+            return json.loads(theme_file.read().decode("utf-8"))
         finally:
             theme_file.close()
-        super(ThemeFromPath, self).__init__(dictionary, resources_path)
+
+
+class ThemeFromBundle(ThemeFromPath):
+    """
+    A theme that is loaded from a bundle compiled by Theme.compile(). By default, the
+    bundle is 'theme.bundle' inside the resources_path given.
+    If the bundle does not exist or is older than the sources in resources_path,
+    it is compiled first; if it cannot be written (e.g. the theme is installed read-only),
+    the theme is loaded from its sources.
+    """
+    def __init__(self, resources_path, bundle_path=None):
+        if bundle_path is None:
+            bundle_path = get_default_bundle_path(resources_path)
+
+        bundle = read_bundle(resources_path, bundle_path)
+        if bundle is None:
+            try:
+                self.compile(resources_path, bundle_path)
+            except (IOError, OSError):
+                ThemeFromPath.__init__(self, resources_path)
+                return
+            bundle = read_bundle(resources_path, bundle_path)
+        dictionary, textures, images = bundle
+
+        self._resources_path = resources_path
+        Theme.__init__(self, dictionary, resources_path,
+                       parsers=[BundleTextureParser(resources_path, textures, images)])
@@ -4,6 +4,10 @@ import sys
 
 import pyglet
 import pyglet_gui.theme
+from pyglet_gui.manager import Manager
+from pyglet_gui.buttons import Button, Checkbox
+from pyglet_gui.containers import VerticalContainer
+from pyglet_gui.gui import Frame, Label
 
 
 class TestPygletGUI(unittest.TestCase):
@@ -22,5 +26,27 @@ class TestPygletGUI(unittest.TestCase):
             self.window.clear()
             self.batch.draw()
 
+    def create_manager(self, **kwargs):
+        """
+        Returns a manager with a frame, a label, a button and a pressed checkbox.
+        """
+        self.button = Button('button')
+        self.checkbox = Checkbox('checkbox', is_pressed=True)
+        return Manager(Frame(VerticalContainer([Label('label'), self.button, self.checkbox])),
+                       window=self.window, batch=self.batch, theme=self.theme, **kwargs)
+
+    def draw(self):
+        """
+        Draws the batch in the window, and returns the pixels of the window.
+        """
+        self.window.switch_to()
+        # sets the window's projection.
+        self.window.on_resize(self.window.width, self.window.height)
+        self.window.clear()
+        self.batch.draw()
+        buffer = pyglet.image.get_buffer_manager().get_color_buffer()
+        return bytes(buffer.get_image_data().get_data('RGBA', buffer.width * 4))
+
     def tearDown(self):
         self.window.close()
+        self.theme.release()
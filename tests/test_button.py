@@ -30,6 +30,58 @@ class TestButton(TestPygletGUI, GenericButtonTest):
         GenericButtonTest.setUp(self)
 
 
+class TestStateChange(TestPygletGUI):
+    """
+    Tests that changing the state of a button changes its graphics in place.
+    """
+    def assertSameGraphics(self, button, other):
+        self.assertEqual(list(button._button._vertex_list.tex_coords), list(other._button._vertex_list.tex_coords))
+        self.assertEqual(tuple(button._button.color), tuple(other._button.color))
+        self.assertEqual(button._button._group.color, other._button._group.color)
+        self.assertEqual(list(button._button._vertex_list.vertices), list(other._button._vertex_list.vertices))
+        self.assertEqual(tuple(button._label.color), tuple(other._label.color))
+
+    def test_button(self):
+        button = Button(label="test")
+        pressed_button = Button(label="test", is_pressed=True)
+        self.manager = Manager(button, window=self.window, batch=self.batch, theme=self.theme)
+        pressed_manager = Manager(pressed_button, window=self.window, batch=self.batch, theme=self.theme)
+
+        vertex_list, label = button._button._vertex_list, button._label
+        button.on_mouse_press(0, 0, None, None)
+
+        self.assertTrue(button._button._vertex_list is vertex_list)
+        self.assertTrue(button._label is label)
+        self.assertSameGraphics(button, pressed_button)
+
+        pressed_manager.delete()
+
+    def test_checkbox(self):
+        checkbox = Checkbox(label="test")
+        self.manager = Manager(checkbox, window=self.window, batch=self.batch, theme=self.theme)
+
+        vertex_list = checkbox._button._vertex_list
+        checkbox.on_mouse_press(0, 0, None, None)
+        self.assertTrue(checkbox._button._vertex_list is vertex_list)
+        self.assertEqual(checkbox._button.texture, self.theme[['checkbox', 'checked', 'image']].texture)
+
+    def test_different_geometry(self):
+        self.theme.set_path(['button', 'down', 'font_size'], 20)
+        button = Button(label="test")
+        self.manager = Manager(button, window=self.window, batch=self.batch, theme=self.theme)
+        height = button.height
+
+        # a different font requires a reload.
+        label = button._label
+        button.on_mouse_press(0, 0, None, None)
+        self.assertFalse(button._label is label)
+        self.assertTrue(button.height > height)
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestStateChange, self).tearDown()
+
+
 class TestOneTimeButton(TestPygletGUI, GenericButtonTest):
     def setUp(self):
         TestPygletGUI.setUp(self)
@@ -60,6 +112,31 @@ class TestFocusButton(TestPygletGUI, GenericButtonTest):
         self.button.on_key_press(pyglet.window.key.ENTER,None)
         self.assertEqual(self.button.is_pressed, True)
 
+    def test_focus_is_reused(self):
+        self.assertTrue(self.button._focus is None)
+
+        self.button.on_gain_focus()
+        focus = self.button._focus
+        vertex_list = focus._vertex_list
+        self.assertTrue(focus.is_visible)
+
+        # losing the focus hides the decoration, gaining it shows the same decoration.
+        self.button.on_lose_focus()
+        self.assertTrue(self.button._focus is focus)
+        self.assertFalse(focus.is_visible)
+        self.assertEqual(set(vertex_list.vertices), set([0]))
+
+        self.button.on_gain_focus()
+        self.assertTrue(self.button._focus is focus)
+        self.assertTrue(focus._vertex_list is vertex_list)
+        self.assertEqual(list(vertex_list.vertices), list(focus._get_vertices()))
+
+    def test_unload_focus(self):
+        self.button.on_gain_focus()
+        self.button.on_lose_focus()
+        self.manager.delete()
+        self.assertTrue(self.button._focus is None)
+
 
 if __name__ == "__main__":
     import unittest
@@ -2,7 +2,20 @@ from .setup import TestPygletGUI
 
 from pyglet_gui.core import Viewer
 from pyglet_gui.manager import Manager
-from pyglet_gui.containers import Container
+from pyglet_gui.containers import Container, HorizontalContainer
+
+
+class CountingViewer(Viewer):
+    """
+    A viewer that counts how many times it was measured.
+    """
+    def __init__(self, width=0, height=0):
+        Viewer.__init__(self, width, height)
+        self.measures = 0
+
+    def compute_size(self):
+        self.measures += 1
+        return Viewer.compute_size(self)
 
 
 class TestContainer(TestPygletGUI):
@@ -56,6 +69,44 @@ class TestContainer(TestPygletGUI):
         self.manager.delete()
         super(TestContainer, self).tearDown()
 
+
+class TestMeasuredSize(TestPygletGUI):
+    """
+    Tests that viewers are only measured again when their size is invalidated.
+    """
+
+    def setUp(self):
+        super(TestMeasuredSize, self).setUp()
+
+        self.changed = CountingViewer(width=50, height=50)
+        self.unchanged = CountingViewer(width=50, height=50)
+        self.container = HorizontalContainer([HorizontalContainer([self.changed]),
+                                              HorizontalContainer([self.unchanged])])
+
+        self.manager = Manager(self.container, window=self.window, batch=self.batch, theme=self.theme)
+
+    def test_measured_once(self):
+        self.assertEqual(self.changed.measures, 1)
+        self.assertEqual(self.unchanged.measures, 1)
+
+    def test_bottom_up(self):
+        self.changed.width = 60
+        self.changed.reset_size()
+
+        self.assertEqual(self.container.width, 110 + self.container.padding)
+        self.assertEqual(self.changed.measures, 2)
+        self.assertEqual(self.unchanged.measures, 1)
+
+    def test_top_down(self):
+        self.manager.reset_size(reset_parent=False)
+
+        self.assertEqual(self.changed.measures, 1)
+        self.assertEqual(self.unchanged.measures, 1)
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestMeasuredSize, self).tearDown()
+
 if __name__ == "__main__":
     import unittest
     unittest.main()
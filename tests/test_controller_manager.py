@@ -0,0 +1,202 @@
+from .setup import TestPygletGUI
+
+import pyglet
+
+from pyglet_gui.core import Controller
+from pyglet_gui.manager import Manager, ControllerManager, FocusRing
+from pyglet_gui.buttons import Button, FocusButton
+from pyglet_gui.containers import GridContainer, VerticalContainer
+
+
+class CountingButton(Button):
+    """
+    A button that counts how many times it was hit-tested.
+    """
+    hit_tests = 0
+
+    def hit_test(self, x, y):
+        CountingButton.hit_tests += 1
+        return Button.hit_test(self, x, y)
+
+
+class TestHitTest(TestPygletGUI):
+    """
+    Tests that the controller manager only hit-tests the controllers near a point.
+    """
+
+    def setUp(self):
+        super(TestHitTest, self).setUp()
+
+        self.buttons = [[CountingButton('%d' % (i * 10 + j)) for j in range(10)] for i in range(10)]
+        self.container = GridContainer(self.buttons)
+        self.manager = Manager(self.container, window=self.window, batch=self.batch, theme=self.theme)
+
+    def hover(self, button):
+        CountingButton.hit_tests = 0
+        self.manager.on_mouse_motion(button.x + button.width // 2, button.y + button.height // 2, 0, 0)
+
+    def test_hover(self):
+        button = self.buttons[4][7]
+        self.hover(button)
+
+        self.assertEqual(self.manager._hover, button)
+        # only the buttons near the point were tested.
+        self.assertTrue(CountingButton.hit_tests < 10)
+
+    def test_layout_change(self):
+        self.container.add_row([CountingButton('a much longer button than the others')])
+
+        # the buttons moved and the index follows them.
+        button = self.buttons[2][3]
+        self.hover(button)
+        self.assertEqual(self.manager._hover, button)
+
+    def test_remove(self):
+        button = self.buttons[0][0]
+        x, y = button.x + button.width // 2, button.y + button.height // 2
+        self.container.set(0, 0, None)
+
+        self.manager.on_mouse_motion(x, y, 0, 0)
+        self.assertEqual(self.manager._hover, None)
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestHitTest, self).tearDown()
+
+
+class TestFocusRing(TestPygletGUI):
+    """
+    Tests that TAB moves the focus between focusable controllers in the order they were added.
+    """
+
+    def setUp(self):
+        super(TestFocusRing, self).setUp()
+
+        self.buttons = [FocusButton('%d' % i) for i in range(3)]
+        self.container = VerticalContainer([Button('not focusable')] + self.buttons)
+        self.manager = Manager(self.container, window=self.window, batch=self.batch, theme=self.theme)
+
+    def tab(self, modifiers=0):
+        self.manager.on_key_press(pyglet.window.key.TAB, modifiers)
+
+    def test_next(self):
+        self.tab()
+        self.assertEqual(self.manager._focus, self.buttons[0])
+        self.tab()
+        self.tab()
+        self.assertEqual(self.manager._focus, self.buttons[2])
+        self.tab()
+        self.assertEqual(self.manager._focus, self.buttons[0])
+
+    def test_previous(self):
+        # from no focus, both directions start on the first controller.
+        self.tab(pyglet.window.key.MOD_SHIFT)
+        self.assertEqual(self.manager._focus, self.buttons[0])
+        self.tab(pyglet.window.key.MOD_SHIFT)
+        self.assertEqual(self.manager._focus, self.buttons[2])
+
+    def test_remove(self):
+        self.manager.remove_controller(self.buttons[1])
+        self.assertEqual(list(self.manager._focus_ring), [self.buttons[0], self.buttons[2]])
+
+        # an added controller goes to the end of the ring.
+        self.manager.add_controller(self.buttons[1])
+        self.assertEqual(list(self.manager._focus_ring), [self.buttons[0], self.buttons[2], self.buttons[1]])
+
+    def test_key_dispatch(self):
+        self.tab()
+        self.manager.on_key_press(pyglet.window.key.ENTER, 0)
+        self.assertTrue(self.buttons[0].is_pressed)
+
+    def test_ring(self):
+        ring = FocusRing()
+        for i in range(3):
+            ring.add(i)
+        ring.remove(0)
+
+        self.assertEqual(list(ring), [1, 2])
+        self.assertEqual(ring.get_next(2, 1), 1)
+        self.assertEqual(ring.get_next(1, -1), 2)
+        self.assertEqual(ring.get_next(0, 1), 1)
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestFocusRing, self).tearDown()
+
+
+class TestControllerRegistry(TestPygletGUI):
+    """
+    Tests adding and removing controllers.
+    """
+
+    def setUp(self):
+        super(TestControllerRegistry, self).setUp()
+
+        self.manager = ControllerManager()
+        self.controllers = [Controller() for _ in range(10)]
+        for controller in self.controllers:
+            controller.set_manager(self.manager)
+
+    def test_order(self):
+        self.manager.remove_controller(self.controllers[3])
+        self.controllers[3].set_manager(self.manager)
+
+        self.assertEqual(self.manager.controllers, self.controllers[:3] + self.controllers[4:] + [self.controllers[3]])
+
+    def test_remove_controllers(self):
+        self.manager.set_focus(self.controllers[5])
+        self.manager.remove_controllers(self.controllers[4:8])
+
+        self.assertEqual(self.manager.controllers, self.controllers[:4] + self.controllers[8:])
+        self.assertEqual(self.manager._focus, None)
+
+
+class TestSubtreeDeletion(TestPygletGUI):
+    """
+    Tests that deleting a container removes the controllers of its subtree at once.
+    """
+
+    def setUp(self):
+        super(TestSubtreeDeletion, self).setUp()
+
+        self.buttons = [FocusButton('%d' % i) for i in range(10)]
+        self.container = VerticalContainer([VerticalContainer(self.buttons[:5]),
+                                            VerticalContainer(self.buttons[5:])])
+        self.other = Button('other')
+        self.manager = Manager(VerticalContainer([self.container, self.other]),
+                               window=self.window, batch=self.batch, theme=self.theme)
+
+        self.calls = []
+        remove_controller, remove_controllers = self.manager.remove_controller, self.manager.remove_controllers
+
+        def count_remove_controller(controller):
+            self.calls.append([controller])
+            remove_controller(controller)
+
+        def count_remove_controllers(controllers):
+            self.calls.append(list(controllers))
+            remove_controllers(controllers)
+
+        self.manager.remove_controller = count_remove_controller
+        self.manager.remove_controllers = count_remove_controllers
+
+    def test_container(self):
+        self.manager.set_focus(self.buttons[7])
+        self.manager.content.remove(self.container)
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(set(self.calls[0]), set(self.buttons))
+        self.assertEqual(self.manager.controllers, [self.other])
+        self.assertEqual(self.manager._focus, None)
+        self.manager.delete()
+
+    def test_manager(self):
+        self.manager.delete()
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(set(self.calls[0]), set(self.buttons + [self.other]))
+
+
+if __name__ == "__main__":
+    import unittest
+    unittest.main()
@@ -0,0 +1,144 @@
+from .setup import TestPygletGUI
+
+from pyglet_gui.core import Viewer
+from pyglet_gui.manager import Manager
+from pyglet_gui.containers import VerticalContainer
+from pyglet_gui.gui import Label
+
+
+class CountingContainer(VerticalContainer):
+    """
+    A vertical container that counts how many times it was measured and positioned.
+    """
+    def __init__(self, content):
+        VerticalContainer.__init__(self, content)
+        self.measures = 0
+        self.layouts = 0
+
+    def compute_size(self):
+        self.measures += 1
+        return VerticalContainer.compute_size(self)
+
+    def layout(self):
+        self.layouts += 1
+        VerticalContainer.layout(self)
+
+
+class TestDeferredLayout(TestPygletGUI):
+    """
+    Tests that a manager with a deferred layout only measures
+    and positions its viewers when the layout is flushed.
+    """
+
+    def setUp(self):
+        super(TestDeferredLayout, self).setUp()
+
+        self.labels = [Label('label %d' % i) for i in range(10)]
+        self.container = CountingContainer(self.labels)
+
+        self.manager = Manager(self.container, window=self.window, batch=self.batch, theme=self.theme,
+                               defer_layout=True)
+
+    def test_mutations_are_deferred(self):
+        height = self.container.height
+        self.container.add(Viewer(width=50, height=50))
+
+        # nothing happened yet
+        self.assertEqual(self.container.height, height)
+
+        self.manager.flush_layout()
+        self.assertEqual(self.container.height, height + 50 + self.container.padding)
+        self.assertEqual(self.manager.height, self.container.height)
+
+    def test_single_pass(self):
+        self.container.measures = self.container.layouts = 0
+
+        for label in self.labels:
+            label.set_text('a much longer text than before')
+        self.manager.flush_layout()
+
+        self.assertEqual(self.container.measures, 1)
+        self.assertEqual(self.container.layouts, 1)
+
+        # the content was positioned according to the new sizes.
+        self.assertEqual(self.manager.width, self.labels[0].width)
+        self.assertEqual(self.labels[0].x, self.container.x)
+
+    def test_removed_viewer(self):
+        label = self.labels[0]
+        label.set_text('a much longer text than before')
+        self.container.remove(label)
+
+        self.manager.flush_layout()
+        self.assertEqual(len(self.container.content), 9)
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestDeferredLayout, self).tearDown()
+
+
+class TestBatchUpdate(TestPygletGUI):
+    """
+    Tests that viewers added during a batch update are loaded,
+    measured and positioned once, at the end of the update.
+    """
+
+    def setUp(self):
+        super(TestBatchUpdate, self).setUp()
+
+        self.container = CountingContainer([])
+        self.manager = Manager(self.container, window=self.window, batch=self.batch, theme=self.theme)
+
+    def test_batch_update(self):
+        self.container.measures = self.container.layouts = 0
+        labels = [Label('label %d' % i) for i in range(10)]
+
+        with self.manager.batch_update():
+            for label in labels:
+                self.container.add(label)
+            # nothing was loaded yet.
+            self.assertFalse(labels[0].is_loaded)
+
+        self.assertTrue(all(label.is_loaded for label in labels))
+        self.assertEqual(self.container.measures, 1)
+        self.assertEqual(self.container.layouts, 1)
+        self.assertEqual(self.container.height, sum(label.height for label in labels) + 9*self.container.padding)
+
+    def test_nested(self):
+        label = Label('label')
+        with self.manager.batch_update():
+            with self.manager.batch_update():
+                self.container.add(label)
+            self.assertFalse(label.is_loaded)
+        self.assertTrue(label.is_loaded)
+
+    def test_removed(self):
+        label = Label('label')
+        with self.manager.batch_update():
+            self.container.add(label)
+            self.container.remove(label)
+        self.assertFalse(label.is_loaded)
+        self.assertEqual(self.container.content, [])
+
+    def test_extend(self):
+        # extending by many items costs as much as adding a single item.
+        self.container.measures = 0
+        self.container.add(Label('label'))
+        measures = self.container.measures
+
+        self.container.measures = 0
+        labels = [Label('label %d' % i) for i in range(10)]
+        self.container.extend(labels)
+
+        self.assertEqual(self.container.content[1:], labels)
+        self.assertEqual(self.container.measures, measures)
+        self.assertEqual(self.manager.height, self.container.height)
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestBatchUpdate, self).tearDown()
+
+
+if __name__ == "__main__":
+    import unittest
+    unittest.main()
@@ -1,7 +1,13 @@
 from .setup import TestPygletGUI
 
+import pyglet
+
 from pyglet_gui.manager import Manager
 from pyglet_gui.core import Viewer
+from pyglet_gui.buttons import Button
+from pyglet_gui.containers import VerticalContainer
+from pyglet_gui.scrollable import Scrollable
+from pyglet_gui.text_input import TextInput
 
 import pyglet_gui.constants
 
@@ -123,6 +129,73 @@ class TestDialog(TestPygletGUI):
         self.manager.delete()
         super(TestDialog, self).tearDown()
 
+class TestTranslation(TestPygletGUI):
+    """
+    Tests that moving a manager translates its content instead of laying it out.
+    """
+
+    def setUp(self):
+        super(TestTranslation, self).setUp()
+
+        self.button = Button('button')
+        self.text_input = TextInput('text')
+        self.manager = Manager(VerticalContainer([self.button,
+                                                  Scrollable(VerticalContainer([self.text_input] +
+                                                                               [TextInput('text') for _ in range(5)]),
+                                                             height=50)]),
+                               window=self.window, batch=self.batch, theme=self.theme)
+
+    def drag(self, dx, dy):
+        x, y = self.manager.x + self.manager.width - 1, self.manager.y + 1
+        self.manager.on_mouse_press(x, y, pyglet.window.mouse.LEFT, 0)
+        self.manager.on_mouse_drag(x + dx, y + dy, dx, dy, pyglet.window.mouse.LEFT, 0)
+        self.manager.on_mouse_release(x + dx, y + dy, pyglet.window.mouse.LEFT, 0)
+
+    def test_drag(self):
+        x, y = self.manager.x, self.manager.y
+        button_position = self.button.x, self.button.y
+
+        self.drag(10, 20)
+
+        self.assertEqual((self.manager.x, self.manager.y), (x + 10, y + 20))
+        self.assertEqual(self.manager.translation, (10, 20))
+        # the content was not laid out again.
+        self.assertEqual((self.button.x, self.button.y), button_position)
+
+    def test_offset(self):
+        self.manager.offset = (10, 0)
+        self.assertEqual(self.manager.translation, (10, 0))
+
+        # a full layout resets the translation.
+        self.manager.set_position(*self.manager.get_position())
+        self.assertEqual(self.manager.translation, (0, 0))
+        self.assertEqual(self.manager.content.x, self.manager.x)
+
+    def test_events_are_translated(self):
+        self.drag(10, 20)
+
+        self.manager.on_mouse_motion(self.button.x + 11, self.button.y + 21, 0, 0)
+        self.manager.on_mouse_press(self.button.x + 11, self.button.y + 21, pyglet.window.mouse.LEFT, 0)
+        self.assertTrue(self.button.is_pressed)
+
+    def test_draw(self):
+        """
+        Tests that a translated manager draws the same as a manager laid out in its position.
+        """
+        # the focused text input draws an IncrementalTextLayout.
+        self.manager.set_focus(self.text_input)
+
+        self.manager.offset = (-30, 40)
+        translated = self.draw()
+
+        self.manager.set_position(*self.manager.get_position())
+        self.assertEqual(self.draw(), translated)
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestTranslation, self).tearDown()
+
+
 if __name__ == "__main__":
     import unittest
     unittest.main()
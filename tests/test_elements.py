@@ -0,0 +1,155 @@
+from .setup import TestPygletGUI
+
+import ctypes
+
+import pyglet
+from pyglet import gl
+
+from pyglet_gui.theme.elements import FrameTextureGraphicElement, ThemeTextureGroup, \
+    get_update_stats, reset_update_stats
+
+
+class TestFrameTextureGraphicElement(TestPygletGUI):
+    """
+    Tests the geometry of the 9 rectangles of a frame.
+    """
+    def setUp(self):
+        super(TestFrameTextureGraphicElement, self).setUp()
+        self.template = self.theme[['button', 'up', 'image']]
+
+    def test_indexed(self):
+        empty = self.draw()
+        frame = self.template.generate([255, 255, 255, 255], self.batch, None)
+        frame.update(10, 20, 100, 50)
+
+        # 16 vertices, shared by the 9 rectangles.
+        self.assertEqual(len(frame._vertex_list.vertices), 16 * 2)
+        self.assertEqual(len(FrameTextureGraphicElement.INDICES), 9 * 4)
+        pixels = self.draw()
+        self.assertNotEqual(pixels, empty)
+
+        # the same rectangles, with 4 vertices each.
+        vertices = frame._vertex_list.vertices
+        tex_coords = frame._vertex_list.tex_coords
+        indices = FrameTextureGraphicElement.INDICES
+        quads = self.batch.add(36, gl.GL_QUADS, ThemeTextureGroup(frame.outer_texture, None),
+                               ('v2i', [vertices[2 * index + i] for index in indices for i in range(2)]),
+                               ('c4B', [255] * 4 * 36),
+                               ('t2f', [tex_coords[2 * index + i] for index in indices for i in range(2)]))
+        frame.unload()
+
+        self.assertEqual(self.draw(), pixels)
+        quads.delete()
+
+    def test_group_color(self):
+        color = [200, 100, 50, 255]
+        frame = self.template.generate(color, self.batch, None)
+        frame.update(10, 20, 100, 50)
+
+        # the color is set by the group, shared by the frames of the same texture and color.
+        self.assertNotIn('colors', frame._vertex_list.domain.attribute_names)
+        other = self.template.generate(color, self.batch, None)
+        self.assertEqual(other._group, frame._group)
+        other.unload()
+        pixels = self.draw()
+
+        # the same frame, with a color per vertex.
+        class VertexColorsFrame(FrameTextureGraphicElement):
+            has_vertex_colors = True
+        frame.unload()
+        frame = VertexColorsFrame(frame.outer_texture, frame.inner_texture, frame.margins, frame.padding,
+                                  color, self.batch, None)
+        frame.update(10, 20, 100, 50)
+        self.assertEqual(list(frame._vertex_list.colors), color * 16)
+        self.assertEqual(self.draw(), pixels)
+        frame.unload()
+
+    def test_set_color(self):
+        frame = self.template.generate([255, 255, 255, 255], self.batch, None)
+        vertex_list = frame._vertex_list
+        frame.set_color([255, 0, 0, 255])
+        self.assertTrue(frame._vertex_list is vertex_list)
+        self.assertEqual(frame._group.color, (255, 0, 0, 255))
+        frame.unload()
+
+
+class TestUpdate(TestPygletGUI):
+    """
+    Tests that updating a graphic element only uploads vertices when its geometry changes.
+    """
+    def setUp(self):
+        super(TestUpdate, self).setUp()
+        self.frame = self.theme[['button', 'up', 'image']].generate([255, 255, 255, 255], self.batch, None)
+        self.frame.update(10, 20, 100, 50)
+        reset_update_stats()
+
+    def assertVertices(self):
+        self.assertEqual(list(self.frame._vertex_list.vertices), list(self.frame._get_vertices()))
+
+    def test_unchanged(self):
+        self.frame.update(10, 20, 100, 50)
+        self.assertEqual(get_update_stats(), {'uploaded': 0, 'translated': 0, 'skipped': 1})
+        self.assertVertices()
+
+    def test_translation(self):
+        self.frame.update(15, 10, 100, 50)
+        self.assertEqual(get_update_stats(), {'uploaded': 0, 'translated': 1, 'skipped': 0})
+        self.assertVertices()
+
+    def test_resize(self):
+        self.frame.update(15, 10, 120, 50)
+        self.assertEqual(get_update_stats(), {'uploaded': 1, 'translated': 0, 'skipped': 0})
+        self.assertVertices()
+
+    def test_hidden(self):
+        self.frame.set_visible(False)
+        self.frame.update(15, 10, 120, 50)
+        self.assertEqual(get_update_stats(), {'uploaded': 0, 'translated': 0, 'skipped': 1})
+
+        self.frame.set_visible(True)
+        self.assertVertices()
+
+    def tearDown(self):
+        self.frame.unload()
+        super(TestUpdate, self).tearDown()
+
+
+class TestCompactVertices(TestPygletGUI):
+    """
+    Tests that elements with 16 bit vertices draw the same pixels.
+    """
+    def test_pixels(self):
+        manager = self.create_manager(compact=False)
+        self.button.change_state()
+        manager.set_position(10, 20)
+        expected = self.draw()
+        vertices = self.button._button._vertex_list.vertices
+        manager.delete()
+
+        self.batch = pyglet.graphics.Batch()
+        manager = self.create_manager(compact=True)
+        self.button.change_state()
+        manager.set_position(10, 20)
+        self.assertEqual(self.draw(), expected)
+
+        # the same positions, in half of the bytes.
+        compact_vertices = self.button._button._vertex_list.vertices
+        self.assertEqual(list(compact_vertices), list(vertices))
+        self.assertEqual(ctypes.sizeof(compact_vertices) * 2, ctypes.sizeof(vertices))
+        manager.delete()
+
+    def test_far_off(self):
+        manager = self.create_manager(compact=True)
+        element = self.button._button
+
+        # positions beyond 16 bits fall back to 32 bit positions, only for that element.
+        manager.set_position(40000, -40000)
+        self.assertEqual(element._vertex_format, 'v2i')
+        self.assertEqual(list(element._vertex_list.vertices), list(element._get_vertices()))
+        self.assertEqual(element._vertex_list.vertices[0], element.x)
+        self.assertTrue(element.x > 32767)
+
+        manager.set_position(10, 20)
+        self.assertEqual(element._vertex_format, 'v2s')
+        self.assertEqual(list(element._vertex_list.vertices), list(element._get_vertices()))
+        manager.delete()
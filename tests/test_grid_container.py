@@ -62,6 +62,17 @@ class TestGridContainer(TestPygletGUI):
         self.assertEqual(self.container.width, 150 + 2 * self.container.padding)
         self.assertEqual(self.container.height, 150 + 2 * self.container.padding)
 
+    def test_add_rows(self):
+        """
+        Tests that if we add two rows with 2 columns,
+        we have the correct sizes.
+        """
+        self.container.add_rows([[Viewer(width=50, height=50), Viewer(width=50, height=50)],
+                                 [Viewer(width=50, height=50), Viewer(width=50, height=50)]])
+
+        self.assertEqual(self.container.width, 100 + self.container.padding)
+        self.assertEqual(self.container.height, 200 + 3 * self.container.padding)
+
     def test_add_column(self):
         """
         Tests that if we add a column with 3 rows,
@@ -0,0 +1,72 @@
+from .setup import TestPygletGUI
+
+import gc
+import unittest
+import weakref
+
+import pyglet
+
+from pyglet_gui.theme import instancing
+from pyglet_gui.theme.instancing import InstancedFrameTextureGraphicElement, get_instanced_renderer, \
+    is_instancing_supported
+
+
+@unittest.skipUnless(is_instancing_supported(), 'OpenGL 3.3 is not supported.')
+class TestInstancing(TestPygletGUI):
+    """
+    Tests that the instanced renderer draws the same pixels as vertex lists.
+    """
+    def assertSamePixels(self, change=lambda manager: None):
+        empty = self.draw()
+        manager = self.create_manager(instanced=False)
+        change(manager)
+        expected = self.draw()
+        self.assertNotEqual(expected, empty)
+        manager.delete()
+
+        self.batch = pyglet.graphics.Batch()
+        manager = self.create_manager(instanced=True)
+        change(manager)
+        self.assertEqual(self.draw(), expected)
+        return manager
+
+    def test_pixels(self):
+        manager = self.assertSamePixels()
+
+        self.assertIsInstance(self.button._button, InstancedFrameTextureGraphicElement)
+        # one draw per group and texture: the frame in the panel, and the buttons in the background.
+        self.assertEqual(get_instanced_renderer(self.batch).get_draw_calls(), 2)
+        manager.delete()
+
+    def test_change(self):
+        def change(manager):
+            self.button.change_state()
+            self.checkbox.change_state()
+            manager.set_position(10, 20)
+        manager = self.assertSamePixels(change)
+        manager.delete()
+
+    def test_tint(self):
+        manager = self.assertSamePixels(lambda manager: manager.set_tint([128, 64, 255, 192]))
+        manager.delete()
+
+    def test_delete(self):
+        manager = self.create_manager(instanced=True)
+        manager.delete()
+        self.assertEqual(get_instanced_renderer(self.batch).get_draw_calls(), 0)
+
+    def test_collected(self):
+        manager = self.create_manager(instanced=True)
+        manager.delete()
+        renderer = get_instanced_renderer(self.batch)
+        self.assertTrue(renderer.batch is self.batch)
+
+        batch = weakref.ref(self.batch)
+        manager = self.button = self.checkbox = None
+        self.batch = pyglet.graphics.Batch()
+        gc.collect()
+
+        # the renderer does not keep its batch alive.
+        self.assertEqual(batch(), None)
+        self.assertEqual(renderer.batch, None)
+        self.assertFalse(renderer in list(instancing._renderers.values()))
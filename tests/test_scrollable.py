@@ -0,0 +1,59 @@
+from .setup import TestPygletGUI
+
+import pyglet
+
+from pyglet_gui.manager import Manager
+from pyglet_gui.buttons import Button
+from pyglet_gui.containers import VerticalContainer
+from pyglet_gui.scrollable import Scrollable
+
+
+class TestScrollable(TestPygletGUI):
+    """
+    Tests that scrolling translates the content instead of laying it out.
+    """
+
+    def setUp(self):
+        super(TestScrollable, self).setUp()
+
+        self.buttons = [Button('button %d' % i) for i in range(10)]
+        self.scrollable = Scrollable(VerticalContainer(self.buttons), height=100)
+        self.manager = Manager(self.scrollable, window=self.window, batch=self.batch, theme=self.theme)
+
+    def scroll(self, scroll_y):
+        scrollbar = self.scrollable._vscrollbar
+        scrollbar.on_mouse_scroll(0, 0, 0, scroll_y)
+
+    def test_scroll(self):
+        button = self.buttons[-1]
+        position = button.x, button.y
+
+        self.scroll(20)
+
+        # the content was not laid out again.
+        self.assertEqual((button.x, button.y), position)
+        self.assertEqual(self.scrollable.root_group.translation,
+                         (0, self.scrollable._vscrollbar.get_knob_pos()))
+        self.assertNotEqual(self.scrollable.root_group.translation, (0, 0))
+
+    def test_events_are_translated(self):
+        self.scroll(100)
+        button = self.buttons[-1]
+        _, scroll_y = self.scrollable.root_group.translation
+
+        # the last button is visible at its translated position.
+        x, y = button.x + 1, button.y + scroll_y + 1
+        self.assertTrue(self.scrollable.hit_test(x, y))
+
+        self.manager.on_mouse_motion(x, y, 0, 0)
+        self.manager.on_mouse_press(x, y, pyglet.window.mouse.LEFT, 0)
+        self.assertTrue(button.is_pressed)
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestScrollable, self).tearDown()
+
+
+if __name__ == "__main__":
+    import unittest
+    unittest.main()
@@ -1,8 +1,18 @@
+import gc
+import json
+import os
+import shutil
+import struct
+import tempfile
 import unittest
 
 import pyglet
 
-from pyglet_gui.theme import Theme
+from pyglet_gui.theme import Theme, ThemeFromPath, ThemeFromBundle
+from pyglet_gui.theme import parsers
+from pyglet_gui.theme.parsers import TextureParser
+from pyglet_gui.theme.cache import TextureCache
+from pyglet_gui.theme.bundle import MAGIC, VERSION, read_bundle
 
 
 class TestTheme(unittest.TestCase):
@@ -46,6 +56,62 @@ class TestTheme(unittest.TestCase):
         path = ['first depth', 'other second depth']
         self.assertEqual(theme[path], [1, 1, 1, 1])
 
+    def test_lookup_invalidation(self):
+        theme = Theme({'color': [0, 0, 0, 0],
+                       'first depth': {'second depth': {'size': 1}}}, 'some_path')
+
+        path = ['first depth', 'second depth']
+        self.assertEqual(theme[path + ['color']], [0, 0, 0, 0])
+        self.assertEqual(theme[path]['size'], 1)
+
+        # modifications anywhere in the tree are seen by memoized lookups.
+        theme['color'] = [1, 1, 1, 1]
+        theme.set_path(path + ['size'], 2)
+        self.assertEqual(theme[path + ['color']], [1, 1, 1, 1])
+        self.assertEqual(theme[path]['size'], 2)
+
+        theme.update({'color': [2, 2, 2, 2]})
+        self.assertEqual(theme[path]['color'], [2, 2, 2, 2])
+
+        del theme[path]['size']
+        self.assertRaises(KeyError, theme[path].__getitem__, 'size')
+
+    def test_pop_invalidation(self):
+        theme = Theme({'color': [0, 0, 0, 0],
+                       'first depth': {'color': [1, 1, 1, 1]}}, 'some_path')
+
+        path = ['first depth', 'color']
+        self.assertEqual(theme[path], [1, 1, 1, 1])
+
+        # the memoized lookup falls back to the parent once the key is popped.
+        self.assertEqual(theme['first depth'].pop('color'), [1, 1, 1, 1])
+        self.assertEqual(theme[path], [0, 0, 0, 0])
+
+        theme['first depth'].setdefault('color', [2, 2, 2, 2])
+        self.assertEqual(theme[path], [2, 2, 2, 2])
+
+        theme['first depth'].popitem()
+        self.assertEqual(theme[path], [0, 0, 0, 0])
+
+        theme.clear()
+        self.assertRaises(KeyError, theme.__getitem__, 'color')
+
+    def test_resolve(self):
+        theme = Theme({'color': [0, 0, 0, 0],
+                       'size': 1,
+                       'first depth': {'size': 2}}, 'some_path')
+
+        scope = theme.resolve(['first depth'])
+        # keys of the parents are visible, unless overridden.
+        self.assertEqual(scope['size'], 2)
+        self.assertEqual(scope['color'], [0, 0, 0, 0])
+        self.assertEqual(set(scope), set(['color', 'size', 'first depth']))
+        self.assertTrue(theme.resolve(['first depth']) is scope)
+        self.assertFalse(hasattr(scope, '__setitem__'))
+
+        theme['color'] = [1, 1, 1, 1]
+        self.assertEqual(theme.resolve(['first depth'])['color'], [1, 1, 1, 1])
+
     def test_load_texture(self):
         theme = Theme({'first depth': {'image': 'panel.png'}}, 'theme')
 
@@ -98,6 +164,143 @@ class TestTheme(unittest.TestCase):
         self.assertEqual(theme['first depth']['image'].width, 16)
         self.assertEqual(theme['first depth']['image'].height, 16)
 
+    def test_atlas(self):
+        theme = Theme({'first': {'image': 'panel.png'},
+                       'second': {'image': {'source': 'button.png', 'frame': [6, 5, 6, 3]}}}, '../theme')
+
+        # both images are packed in the same texture.
+        self.assertEqual(theme['first']['image'].texture.id, theme['second']['image'].texture.id)
+
+    def test_shared_regions(self):
+        theme = Theme({'first': {'image': {'source': 'panel.png', 'region': [0, 0, 16, 16]}},
+                       'second': {'image': {'source': 'panel.png', 'region': [0, 0, 16, 16]}},
+                       'third': {'image': 'panel.png'}}, 'theme')
+
+        # equal regions are the same region of the source's texture.
+        self.assertTrue(theme['first']['image'].texture is theme['second']['image'].texture)
+        self.assertEqual(theme['first']['image'].texture.id, theme['third']['image'].texture.id)
+
+    def test_lazy(self):
+        parser = TextureParser('../theme', lazy=True, cache=TextureCache())
+        theme = Theme({'first': {'image': 'panel.png'},
+                       'second': {'image': {'source': 'button.png', 'frame': [6, 5, 6, 3]}}},
+                      '../theme', parsers=[parser])
+
+        # nothing is loaded until the template is used.
+        self.assertEqual(parser._textures, {})
+        self.assertFalse(theme['first']['image'].is_loaded)
+
+        self.assertEqual(theme['first']['image'].width, 32)
+        self.assertEqual(set(parser._textures), set(['panel.png']))
+        self.assertFalse(theme['second']['image'].is_loaded)
+
+    def test_preload(self):
+        theme = Theme({'first': {'image': 'panel.png'},
+                       'second': {'down': {'image': 'button.png'}}}, '../theme', lazy=True)
+
+        theme.preload([['second']])
+        self.assertTrue(theme[['second', 'down', 'image']].is_loaded)
+        self.assertFalse(theme['first']['image'].is_loaded)
+
+    def test_parallel_decoding(self):
+        dictionary = {'first': {'image': 'panel.png'},
+                      'second': {'image': {'source': 'button.png', 'frame': [6, 5, 6, 3]}},
+                      'third': {'image': {'source': 'vscrollbar.png', 'region': [0, 0, 16, 16]}}}
+        parser = TextureParser('../theme', processes=2, cache=TextureCache())
+        theme = Theme(dictionary, '../theme', parsers=[parser])
+        serial_theme = Theme(dictionary, '../theme', parsers=[TextureParser('../theme', processes=1,
+                                                                            cache=TextureCache())])
+
+        # all images were decoded before the elements were parsed.
+        self.assertEqual(set(parser._textures), set(['panel.png', 'button.png', 'vscrollbar.png']))
+
+        for key in dictionary:
+            texture, serial_texture = theme[key]['image'].texture, serial_theme[key]['image'].texture
+            self.assertEqual(texture.get_image_data().get_data('RGBA', texture.width * 4),
+                             serial_texture.get_image_data().get_data('RGBA', serial_texture.width * 4))
+
+        # the pool is kept for the next load.
+        pool = parsers._pool
+        self.assertTrue(pool is not None)
+        TextureParser('../theme', processes=2, cache=TextureCache()).prepare(dictionary)
+        self.assertTrue(parsers._pool is pool)
+
+    def test_sequential_decoding(self):
+        parsers._close_pool()
+        Theme({'image': 'panel.png'}, '../theme', parsers=[TextureParser('../theme', cache=TextureCache())])
+        self.assertTrue(parsers._pool is None)
+
+
+class TestTextureCache(unittest.TestCase):
+    """
+    Tests that textures are shared between themes and evicted under the budget.
+    """
+    def setUp(self):
+        self.cache = TextureCache()
+        self.dictionary = {'first': {'image': 'panel.png'},
+                           'second': {'image': {'source': 'panel.png', 'region': [0, 0, 16, 16]}}}
+
+    def get_theme(self):
+        return Theme(self.dictionary, 'theme', parsers=[TextureParser('theme', cache=self.cache)])
+
+    def test_shared(self):
+        theme = self.get_theme()
+        # the image is in an atlas, which takes its whole size.
+        self.assertEqual(self.cache.get_stats(), {'hits': 0, 'misses': 2, 'bytes_resident': 1024 * 1024 * 4,
+                                                  'textures': 1})
+
+        other_theme = self.get_theme()
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertTrue(theme['first']['image'].texture is other_theme['first']['image'].texture)
+        self.assertTrue(theme['second']['image'].texture is other_theme['second']['image'].texture)
+
+    def test_eviction(self):
+        self.cache.budget = 0
+        theme = self.get_theme()
+        other_theme = self.get_theme()
+
+        # textures with references are never evicted.
+        theme.release()
+        self.assertEqual(len(self.cache), 1)
+
+        other_theme.release()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.bytes_resident, 0)
+
+    def test_clear(self):
+        theme = self.get_theme()
+        theme.release()
+        self.assertEqual(len(self.cache), 1)
+
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.bytes_resident, 0)
+
+    def test_atlas_bytes(self):
+        image = pyglet.image.ImageData(32, 32, 'RGBA', b'\0' * 32 * 32 * 4)
+        self.cache.add('first', image)
+        self.cache.add('second', image)
+
+        # both images share one atlas, freed when both are evicted.
+        self.assertEqual(self.cache.bytes_resident, 1024 * 1024 * 4)
+        self.cache.release('first')
+        self.cache.clear()
+        self.assertEqual(self.cache.bytes_resident, 1024 * 1024 * 4)
+        self.cache.release('second')
+        self.cache.clear()
+        self.assertEqual(self.cache.bytes_resident, 0)
+
+    def test_collected(self):
+        for _ in range(3):
+            self.get_theme()
+        gc.collect()
+
+        # themes collected without release() release their textures.
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.bytes_resident, 0)
+
 
 class TestLoadGraphics(unittest.TestCase):
 
@@ -140,5 +343,85 @@ class TestLoadGraphics(unittest.TestCase):
         self.assertEqual(texture.height, 32)
 
 
+class TestBundle(unittest.TestCase):
+    """
+    Tests that a theme loaded from a compiled bundle equals the theme loaded from its sources.
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.resources_path = os.path.join(self.path, 'theme')
+        shutil.copytree(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'theme'),
+                        self.resources_path)
+
+    def get_pixels(self, texture):
+        return texture.get_image_data().get_data('RGBA', texture.width * 4)
+
+    def test_load(self):
+        bundle_path = Theme.compile(self.resources_path)
+        self.assertTrue(os.path.exists(bundle_path))
+
+        theme = ThemeFromBundle(self.resources_path)
+        source_theme = ThemeFromPath(self.resources_path)
+
+        self.assertEqual(theme['font'], source_theme['font'])
+        for path in [['button', 'down', 'image'], ['vscrollbar', 'knob', 'image'], ['frame', 'image']]:
+            texture, source_texture = theme[path].texture, source_theme[path].texture
+            self.assertEqual((texture.width, texture.height), (source_texture.width, source_texture.height))
+            self.assertEqual(self.get_pixels(texture), self.get_pixels(source_texture))
+
+    def test_compile_when_missing(self):
+        ThemeFromBundle(self.resources_path)
+        self.assertTrue(os.path.exists(os.path.join(self.resources_path, 'theme.bundle')))
+
+    def test_stale_bundle(self):
+        bundle_path = Theme.compile(self.resources_path)
+        self.assertEqual(ThemeFromBundle(self.resources_path)['font_size'], 12)
+
+        # the source changes after the bundle was compiled.
+        theme_filename = os.path.join(self.resources_path, 'theme.json')
+        with open(theme_filename) as theme_file:
+            source = theme_file.read()
+        with open(theme_filename, 'w') as theme_file:
+            theme_file.write(source.replace('"font_size": 12', '"font_size": 14'))
+        mtime = os.path.getmtime(bundle_path) + 10
+        os.utime(theme_filename, (mtime, mtime))
+
+        self.assertEqual(ThemeFromBundle(self.resources_path)['font_size'], 14)
+
+    def test_invalid_bundle(self):
+        bundle_path = os.path.join(self.resources_path, 'theme.bundle')
+        with open(bundle_path, 'wb') as bundle_file:
+            bundle_file.write(MAGIC + struct.pack('<I', 5) + b'cos\nx')
+
+        # the header is not valid JSON, so the bundle is compiled again.
+        self.assertEqual(read_bundle(self.resources_path, bundle_path), None)
+        self.assertEqual(ThemeFromBundle(self.resources_path)['font_size'], 12)
+        self.assertTrue(read_bundle(self.resources_path, bundle_path) is not None)
+
+    def test_missing_header_key(self):
+        bundle_path = os.path.join(self.resources_path, 'theme.bundle')
+        header = json.dumps({'version': VERSION, 'mtimes': {}, 'dictionary': {}}).encode('utf-8')
+        with open(bundle_path, 'wb') as bundle_file:
+            bundle_file.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+        # the header has no atlases nor images, so the bundle is compiled again.
+        self.assertEqual(read_bundle(self.resources_path, bundle_path), None)
+        self.assertEqual(ThemeFromBundle(self.resources_path)['font_size'], 12)
+        self.assertTrue(read_bundle(self.resources_path, bundle_path) is not None)
+
+    def test_read_only(self):
+        bundle_path = os.path.join(self.path, 'missing', 'theme.bundle')
+
+        # the bundle cannot be written, so the theme is loaded from its sources.
+        theme = ThemeFromBundle(self.resources_path, bundle_path)
+        self.assertFalse(os.path.exists(bundle_path))
+        self.assertEqual(theme['font_size'], 12)
+        self.assertEqual(theme[['button', 'down', 'image']].texture.width,
+                         ThemeFromPath(self.resources_path)[['button', 'down', 'image']].texture.width)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+
 if __name__ == "__main__":
     unittest.main()
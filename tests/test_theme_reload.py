@@ -0,0 +1,108 @@
+from .setup import TestPygletGUI
+
+import json
+import os
+import shutil
+import tempfile
+
+import pyglet_gui.theme
+from pyglet_gui.manager import Manager
+from pyglet_gui.buttons import Button
+from pyglet_gui.gui import Label
+from pyglet_gui.containers import VerticalContainer
+
+
+class CountingButton(Button):
+    """
+    A button that counts how many times it loaded its graphics.
+    """
+    def __init__(self, *args, **kwargs):
+        Button.__init__(self, *args, **kwargs)
+        self.loads = 0
+
+    def load_graphics(self):
+        self.loads += 1
+        Button.load_graphics(self)
+
+
+class CountingLabel(Label):
+    def __init__(self, *args, **kwargs):
+        Label.__init__(self, *args, **kwargs)
+        self.loads = 0
+
+    def load_graphics(self):
+        self.loads += 1
+        Label.load_graphics(self)
+
+
+class TestThemeReload(TestPygletGUI):
+    """
+    Tests that reloading a theme only reloads the viewers affected by what changed.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.resources_path = os.path.join(self.path, 'theme')
+        shutil.copytree(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'theme'),
+                        self.resources_path)
+
+        super(TestThemeReload, self).setUp()
+        self.theme.release()
+        self.theme = pyglet_gui.theme.ThemeFromPath(self.resources_path)
+
+        self.button = CountingButton('button')
+        self.pressed_button = CountingButton('pressed', is_pressed=True)
+        self.label = CountingLabel('label', path=['titlebar'])
+        self.manager = Manager(VerticalContainer([self.button, self.pressed_button, self.label]),
+                               window=self.window, batch=self.batch, theme=self.theme)
+
+        for viewer in [self.button, self.pressed_button, self.label]:
+            viewer.loads = 0
+
+    def edit_theme(self, edit):
+        theme_filename = os.path.join(self.resources_path, 'theme.json')
+        with open(theme_filename) as theme_file:
+            dictionary = json.load(theme_file)
+        edit(dictionary)
+        with open(theme_filename, 'w') as theme_file:
+            json.dump(dictionary, theme_file)
+
+    def test_unchanged(self):
+        self.assertEqual(self.theme.reload(), [])
+        self.assertEqual((self.button.loads, self.pressed_button.loads, self.label.loads), (0, 0, 0))
+
+    def test_changed_key(self):
+        def edit(dictionary):
+            dictionary['button']['down']['text_color'] = [255, 0, 0, 255]
+        self.edit_theme(edit)
+
+        self.assertEqual(self.theme.reload(), [(['button', 'down', 'text_color'], False)])
+        self.assertEqual(self.theme[['button', 'down', 'text_color']], [255, 0, 0, 255])
+
+        # only the pressed button uses the changed key.
+        self.assertEqual((self.button.loads, self.pressed_button.loads, self.label.loads), (0, 1, 0))
+        self.assertEqual(list(self.pressed_button._label.color), [255, 0, 0, 255])
+
+    def test_inherited_key(self):
+        def edit(dictionary):
+            dictionary['text_color'] = [255, 0, 0, 255]
+        self.edit_theme(edit)
+
+        self.theme.reload()
+
+        # the pressed button overrides the text color.
+        self.assertEqual((self.button.loads, self.pressed_button.loads, self.label.loads), (1, 0, 1))
+
+    def test_changed_image(self):
+        # button.png is modified, without changing theme.json.
+        filename = os.path.join(self.resources_path, 'button.png')
+        mtime = os.path.getmtime(filename) + 10
+        os.utime(filename, (mtime, mtime))
+
+        self.assertEqual(self.theme.reload(), [(['button', 'up', 'image'], False)])
+        self.assertEqual((self.button.loads, self.pressed_button.loads, self.label.loads), (1, 0, 0))
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestThemeReload, self).tearDown()
+        shutil.rmtree(self.path)
@@ -0,0 +1,110 @@
+from .setup import TestPygletGUI
+
+from pyglet_gui.manager import Manager
+from pyglet_gui.buttons import Button, FocusButton
+from pyglet_gui.containers import VerticalContainer
+from pyglet_gui.gui import Frame, Label
+from pyglet_gui.sliders import HorizontalSlider
+from pyglet_gui.text_input import TextInput
+from pyglet_gui.core import tint_color
+
+TINT = [128, 128, 128, 255]
+
+
+class TestTint(TestPygletGUI):
+    """
+    Tests that tinting viewers changes the colors of their graphics in place.
+    """
+    def setUp(self):
+        super(TestTint, self).setUp()
+
+        self.label = Label('label')
+        self.button = Button('button')
+        self.focus_button = FocusButton('focus')
+        self.slider = HorizontalSlider()
+        self.text_input = TextInput('text')
+        self.frame = Frame(VerticalContainer([self.label, self.button, self.focus_button,
+                                              self.slider, self.text_input]))
+        self.manager = Manager(self.frame, window=self.window, batch=self.batch, theme=self.theme)
+
+    def test_tint(self):
+        pixels = self.draw()
+        vertex_list, label = self.button._button._vertex_list, self.button._label
+
+        self.frame.set_tint(TINT)
+
+        # nothing was reloaded.
+        self.assertTrue(self.button._button._vertex_list is vertex_list)
+        self.assertTrue(self.button._label is label)
+
+        gui_color = self.theme[['button', 'up', 'gui_color']]
+        self.assertEqual(self.button._button._group.color, tuple(tint_color(gui_color, TINT)))
+        self.assertEqual(tuple(self.button._label.color),
+                         tuple(tint_color(self.theme[['button', 'up', 'text_color']], TINT)))
+        self.assertEqual(tuple(self.label.label.color), tuple(tint_color(self.theme['text_color'], TINT)))
+        self.assertEqual(self.slider._knob.tint, TINT)
+        self.assertEqual(self.text_input._field.tint, TINT)
+        self.assertEqual(self.frame._frame.tint, TINT)
+        self.assertNotEqual(self.draw(), pixels)
+
+        self.frame.set_tint(None)
+        self.assertEqual(self.draw(), pixels)
+
+    def test_manager_tint(self):
+        pixels = self.draw()
+        group, label_color = self.button._button._group, tuple(self.button._label.color)
+
+        self.manager.set_tint(TINT)
+
+        # the tint is a state of the root group: no graphic changed.
+        self.assertEqual(self.manager.root_group.tint, TINT)
+        self.assertTrue(self.button._button._group is group)
+        self.assertEqual(self.button._button.tint, None)
+        self.assertEqual(tuple(self.button._label.color), label_color)
+
+        tinted = self.draw()
+        self.assertNotEqual(tinted, pixels)
+        # every pixel is darker, including the ones of the labels.
+        self.assertTrue(all(tinted_component <= component
+                            for tinted_component, component in zip(tinted, pixels)))
+
+        # state changes are drawn tinted.
+        self.button.change_state()
+        self.assertEqual(self.button._button.tint, None)
+        self.assertEqual(self.manager.root_group.tint, TINT)
+
+        self.button.change_state()
+        self.manager.set_tint(None)
+        self.assertEqual(self.draw(), pixels)
+
+        # the same pixels as tinting every viewer.
+        self.frame.set_tint(TINT)
+        self.assertEqual(self.draw(), tinted)
+
+    def test_not_recursive(self):
+        self.frame.set_tint(TINT, recursive=False)
+        self.assertEqual(self.frame._frame.tint, TINT)
+        self.assertEqual(self.button.tint, None)
+        self.assertEqual(self.button._button.tint, None)
+
+    def test_state_change(self):
+        self.frame.set_tint(TINT)
+        self.button.change_state()
+        self.assertEqual(self.button._button.tint, TINT)
+        self.assertEqual(tuple(self.button._label.color),
+                         tuple(tint_color(self.theme[['button', 'down', 'text_color']], TINT)))
+
+    def test_decorations(self):
+        self.frame.set_tint(TINT)
+        self.manager.set_focus(self.focus_button)
+        self.assertEqual(self.focus_button._focus.tint, TINT)
+
+        # the text input is reloaded when it gains the focus.
+        self.manager.set_focus(self.text_input)
+        self.assertEqual(self.text_input._field.tint, TINT)
+        self.assertEqual(tuple(self.text_input._document.get_style('color')),
+                         tuple(tint_color(self.theme[['input', 'text_color']], TINT)))
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestTint, self).tearDown()
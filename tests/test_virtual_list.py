@@ -0,0 +1,83 @@
+from .setup import TestPygletGUI
+
+from pyglet_gui.manager import Manager
+from pyglet_gui.scrollable import VirtualList
+from pyglet_gui.gui import Label
+
+
+class TestVirtualList(TestPygletGUI):
+    """
+    Tests that a virtual list only holds the rows of its visible region.
+    """
+
+    def setUp(self):
+        super(TestVirtualList, self).setUp()
+
+        self.created = 0
+        self.list = VirtualList(20000, self.create_row, width=100, height=100, row_height=20,
+                                bind_row=self.bind_row, overscan=1)
+
+        self.manager = Manager(self.list, window=self.window, batch=self.batch, theme=self.theme)
+
+    def create_row(self, index):
+        self.created += 1
+        return Label('row %d' % index)
+
+    def bind_row(self, row, index):
+        row.set_text('row %d' % index)
+
+    def scroll_to(self, index):
+        scrollbar = self.list._vscrollbar
+        scrollbar.set_knob_pos(float(index) / self.list.item_count + scrollbar._knob_size / 2)
+        scrollbar.re_layout()
+
+    def test_visible_rows(self):
+        # 100/20 visible rows plus 1 of overscan.
+        self.assertEqual(len(self.list.content.content), 6)
+        self.assertEqual(self.list.get_row(0).text, 'row 0')
+        self.assertEqual(self.list.get_row(6), None)
+
+        # the first row is on the top of the list.
+        row = self.list.get_row(0)
+        top = self.list.y + self.list.height
+        self.assertTrue(top - 20 <= row.y and row.y + row.height <= top)
+
+    def test_scroll(self):
+        self.scroll_to(10000)
+        first, last = self.list.get_visible_range()
+
+        self.assertTrue(first <= 10000 < last)
+        self.assertEqual(self.list.get_row(0), None)
+        self.assertEqual(self.list.get_row(first).text, 'row %d' % first)
+
+        # the row of the index is shown within the list.
+        row = self.list.get_row(10000)
+        _, scroll_y = self.list.root_group.translation
+        self.assertTrue(self.list.y <= row.y + scroll_y < self.list.y + self.list.height)
+
+        # rows were recycled: we only created rows for the visible region.
+        self.assertEqual(self.created, len(self.list.content.content))
+
+    def test_set_item_count(self):
+        self.list.set_item_count(2)
+
+        self.assertEqual(len(self.list.content.content), 2)
+        self.assertEqual(self.list.content.height, 40)
+
+    def test_item_count_keeps_size(self):
+        size = self.list.width, self.list.height
+        self.list.set_item_count(10000)
+
+        # the list keeps its size, but its content has the height of the new rows.
+        self.assertEqual((self.list.width, self.list.height), size)
+        self.assertEqual(self.list.content.height, 10000 * 20)
+        self.assertEqual(self.list.get_row(0).text, 'row 0')
+
+    def tearDown(self):
+        self.manager.delete()
+        super(TestVirtualList, self).tearDown()
+
+
+if __name__ == "__main__":
+    import unittest
+    unittest.main()